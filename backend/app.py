@@ -1,17 +1,50 @@
 import datetime
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import FileResponse
+import shutil
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, File, Query, Request, UploadFile, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import os
-import zipfile
 from loguru import logger
 from pydantic import BaseModel
-from sivap import process_excel_files
 from fastapi.middleware.cors import CORSMiddleware
-from partial import partialRun
+from jobs import (
+    copy_customer_data,
+    get_job,
+    job_status,
+    run_partial_job,
+    run_pipeline_job,
+    shutdown_jobs,
+    submit_job,
+)
+from batch_scoring import BATCH_FORMATS, spool_body, stream_scores, validate_batch
+from model_server import resident_model, score_records
+from cpi import CPI_FILE_NAME, cpi_table_stored, seed_cpi_table, start_cpi_refresh
+from export import DEFAULT_EXPORT_FORMAT, EXPORT_FORMATS
+from workspace import (
+    create_run_dir,
+    is_run_complete,
+    latest_run_artifact,
+    latest_run_file,
+    run_inputs_dir,
+)
+from zip_stream import list_artifacts, stream_zip
 import re
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_cpi_refresh()
+    # Kayıtlı model varsa ilk /score isteği beklemesin
+    try:
+        resident_model()
+    except FileNotFoundError:
+        print("No registered model yet, /score is unavailable until a run finishes")
+    yield
+    shutdown_jobs()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow requests from your frontend
 app.add_middleware(
@@ -22,10 +55,9 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
-UPLOAD_DIR = "uploads"
-AKTİVİTELER_DIR = "uploads/aktivite_raporlari"
-GİRİŞ_ÇIKIŞ_DIR = "uploads/giris_cikis_verileri"
-PROCESSED_DIR = "processed"
+# Çalışmanın girdi klasörü altındaki rapor klasörleri
+AKTİVİTELER_DIR = "aktivite_raporlari"
+GİRİŞ_ÇIKIŞ_DIR = "giris_cikis_verileri"
 FIXED_DIR = "fixedFiles"
 
 CUTOFF_DATE = "2222-02-22"
@@ -35,6 +67,12 @@ class DateRequest(BaseModel):
     date: str
 
 
+class ScoreRequest(BaseModel):
+    # Ham sözleşme alanları (ör. "Üyelik Adı", "Sözleşme Yaşı") ya da hazır
+    # "_Range" değerleri
+    contracts: list[dict]
+
+
 @app.post("/set-date")
 async def set_date(request: DateRequest):
     global CUTOFF_DATE
@@ -54,32 +92,44 @@ async def set_date(request: DateRequest):
     return {"message": "Date set successfully", "date": CUTOFF_DATE}
 
 
-@app.post("/upload")
-async def upload_files(files: list[UploadFile] = File(...)):
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    os.makedirs(AKTİVİTELER_DIR, exist_ok=True)
-    os.makedirs(GİRİŞ_ÇIKIŞ_DIR, exist_ok=True)
-    os.makedirs(PROCESSED_DIR, exist_ok=True)
-    try:
-        file_paths = {}
+def _check_export_format(export_format: str) -> None:
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Expected one of: {', '.join(EXPORT_FORMATS)}",
+        )
 
-        # Save uploaded files
-        for file in files:
-            filename = os.path.basename(file.filename)
 
-            if filename.startswith("aktivite rap"):
-                file_path = os.path.join(AKTİVİTELER_DIR, filename)
-                with open(file_path, "wb") as f:
-                    f.write(await file.read())
-            elif filename.startswith("giris"):
-                file_path = os.path.join(GİRİŞ_ÇIKIŞ_DIR, filename)
-                with open(file_path, "wb") as f:
-                    f.write(await file.read())
-            else:
-                file_path = os.path.join(UPLOAD_DIR, filename)
-                with open(file_path, "wb") as f:
-                    f.write(await file.read())
-                file_paths[filename] = file_path
+async def _save_uploads(files: list[UploadFile], run_dir: str) -> dict:
+    # Raporlar kendi klasörlerine, diğer dosyalar girdi klasörüne yazılır;
+    # dönen sözlük rapor dışındaki dosyaların yolları
+    file_paths = {}
+    for file in files:
+        filename = os.path.basename(file.filename)
+
+        if filename.startswith("aktivite rap"):
+            file_path = os.path.join(run_inputs_dir(run_dir, AKTİVİTELER_DIR), filename)
+        elif filename.startswith("giris"):
+            file_path = os.path.join(run_inputs_dir(run_dir, GİRİŞ_ÇIKIŞ_DIR), filename)
+        else:
+            file_path = os.path.join(run_inputs_dir(run_dir), filename)
+            file_paths[filename] = file_path
+
+        with open(file_path, "wb") as f:
+            f.write(await file.read())
+    return file_paths
+
+
+@app.post("/upload")
+async def upload_files(
+    files: list[UploadFile] = File(...),
+    export_format: str = Query(DEFAULT_EXPORT_FORMAT, alias="format"),
+):
+    _check_export_format(export_format)
+    # Girdiler önce bu çalışmanın klasörüne kaydedilir, iş o kopyaları okur
+    run_dir = create_run_dir()
+    try:
+        file_paths = await _save_uploads(files, run_dir)
 
         for file in files:
             filename = os.path.basename(file.filename)
@@ -97,54 +147,48 @@ async def upload_files(files: list[UploadFile] = File(...)):
         if not uyelik_file or not musteriler_file or not iptal_listesi_file:
             raise HTTPException(status_code=400, detail="Required files missing")
 
-        # Read and process data
-        process_excel_files(
+        # TÜFE tablosu da yüklendiyse store'a eklenir, yoksa saklanan kullanılır
+        if CPI_FILE_NAME in file_paths:
+            seed_cpi_table(file_paths[CPI_FILE_NAME])
+        start_cpi_refresh()
+        # Pipeline TÜİK'e gitmez; saklı tablo yoksa iş kuyruğa girmeden reddedilir
+        if not cpi_table_stored():
+            raise HTTPException(
+                status_code=400,
+                detail=f"No CPI table stored, upload the TÜİK xls ({CPI_FILE_NAME})",
+            )
+
+        # Pipeline bir worker process'te çalışır, istek hemen döner
+        job_id = submit_job(
+            run_pipeline_job,
             uyelik_file,
             musteriler_file,
             iptal_listesi_file,
-            AKTİVİTELER_DIR,
-            GİRİŞ_ÇIKIŞ_DIR,
-            PROCESSED_DIR,
+            run_inputs_dir(run_dir, AKTİVİTELER_DIR),
+            run_inputs_dir(run_dir, GİRİŞ_ÇIKIŞ_DIR),
+            run_dir,
             CUTOFF_DATE,
+            export_format,
         )
-
-        zip_path = os.path.join(PROCESSED_DIR, "processed_files.zip")
-        print(f"Zip path: {zip_path}")
-
-        # Create the zip file
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            # Walk through the directory
-            for root, dirs, files in os.walk(PROCESSED_DIR):
-                for file in files:
-                    # Full file path
-                    file_path = os.path.join(root, file)
-
-                    # Skip adding the zip file itself
-                    if file_path == zip_path:
-                        continue
-
-                    # Calculate relative path
-                    relative_path = os.path.relpath(file_path, PROCESSED_DIR)
-
-                    # Add file to zip
-                    print(f"Adding file: {file_path}")
-                    zip_file.write(file_path, relative_path)
-
-        print(f"Zip file created successfully at: {zip_path}")
-        return FileResponse(
-            zip_path, filename="processed_files.zip", media_type="application/zip"
-        )
+        return job_status(job_id)
+    except HTTPException:
+        shutil.rmtree(run_dir, ignore_errors=True)
+        raise
     except Exception as e:
+        shutil.rmtree(run_dir, ignore_errors=True)
         logger.exception(e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/upload_excel")
-async def upload_excel(file: UploadFile = File(...)):
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    os.makedirs(AKTİVİTELER_DIR, exist_ok=True)
-    os.makedirs(GİRİŞ_ÇIKIŞ_DIR, exist_ok=True)
-    os.makedirs(PROCESSED_DIR, exist_ok=True)
+async def upload_excel(
+    file: UploadFile = File(...),
+    export_format: str = Query(DEFAULT_EXPORT_FORMAT, alias="format"),
+    retrain: bool = False,
+):
+    _check_export_format(export_format)
+    # Girdiler önce bu çalışmanın klasörüne kaydedilir, iş o kopyaları okur
+    run_dir = create_run_dir()
     try:
         filename = os.path.basename(file.filename)
 
@@ -155,8 +199,8 @@ async def upload_excel(file: UploadFile = File(...)):
                 detail="Invalid file type. Please upload an Excel file.",
             )
 
-        # Define where to save the uploaded file (UPLOAD_DIR should be defined)
-        file_path = os.path.abspath(os.path.join(UPLOAD_DIR, filename))
+        # Define where to save the uploaded file
+        file_path = os.path.abspath(os.path.join(run_inputs_dir(run_dir), filename))
         with open(file_path, "wb") as f:
             f.write(await file.read())
 
@@ -166,64 +210,39 @@ async def upload_excel(file: UploadFile = File(...)):
         else:
             print(f"File saved successfully at: {file_path}")
 
-        partialRun(file_path, PROCESSED_DIR, CUTOFF_DATE)
-        zip_path = os.path.join(PROCESSED_DIR, "processed_files.zip")
-        print(f"Zip path: {zip_path}")
-
-        # Create the zip file
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            # Walk through the directory
-            for root, dirs, files in os.walk(PROCESSED_DIR):
-                for file in files:
-                    # Full file path
-                    file_path = os.path.join(root, file)
-
-                    # Skip adding the zip file itself
-                    if file_path == zip_path:
-                        continue
-
-                    # Calculate relative path
-                    relative_path = os.path.relpath(file_path, PROCESSED_DIR)
-
-                    # Add file to zip
-                    print(f"Adding file: {file_path}")
-                    zip_file.write(file_path, relative_path)
+        # Müşteri verisi en son tamamlanmış tam çalışmanın test_db'sinden gelir
+        customer_file = latest_run_artifact("test_db")
+        if not customer_file:
+            raise HTTPException(
+                status_code=400, detail="No completed run with customer data found"
+            )
 
-        print(f"Zip file created successfully at: {zip_path}")
-        return FileResponse(
-            zip_path, filename="processed_files.zip", media_type="application/zip"
+        job_id = submit_job(
+            run_partial_job,
+            file_path,
+            run_dir,
+            CUTOFF_DATE,
+            copy_customer_data(customer_file, run_dir),
+            export_format,
+            retrain,
         )
+        return job_status(job_id)
     except Exception as e:
+        shutil.rmtree(run_dir, ignore_errors=True)
         logger.exception(e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/upload_churners")
-async def upload_churners(files: list[UploadFile] = File(...)):
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    os.makedirs(AKTİVİTELER_DIR, exist_ok=True)
-    os.makedirs(GİRİŞ_ÇIKIŞ_DIR, exist_ok=True)
-    os.makedirs(PROCESSED_DIR, exist_ok=True)
+async def upload_churners(
+    files: list[UploadFile] = File(...),
+    export_format: str = Query(DEFAULT_EXPORT_FORMAT, alias="format"),
+):
+    _check_export_format(export_format)
+    # Girdiler önce bu çalışmanın klasörüne kaydedilir, iş o kopyaları okur
+    run_dir = create_run_dir()
     try:
-        file_paths = {}
-
-        # Save uploaded files
-        for file in files:
-            filename = os.path.basename(file.filename)
-
-            if filename.startswith("aktivite rap"):
-                file_path = os.path.join(AKTİVİTELER_DIR, filename)
-                with open(file_path, "wb") as f:
-                    f.write(await file.read())
-            elif filename.startswith("giris"):
-                file_path = os.path.join(GİRİŞ_ÇIKIŞ_DIR, filename)
-                with open(file_path, "wb") as f:
-                    f.write(await file.read())
-            else:
-                file_path = os.path.join(UPLOAD_DIR, filename)
-                with open(file_path, "wb") as f:
-                    f.write(await file.read())
-                file_paths[filename] = file_path
+        file_paths = await _save_uploads(files, run_dir)
 
         for file in files:
             filename = os.path.basename(file.filename)
@@ -233,9 +252,7 @@ async def upload_churners(files: list[UploadFile] = File(...)):
         uyelik_file = file_paths.get("Effect_üyelik sözleşmeleri.xls")
         musteriler_file = file_paths.get("Effect_müşteriler.xls")
         iptal_listesi_file = file_paths.get("Effect_iptal listesi.xls")
-        inflation_file = file_paths.get(
-            "tuketici fiyat endeksi ve degisim oranlari.xls"
-        )
+        inflation_file = file_paths.get(CPI_FILE_NAME)
 
         for file in files:
             filename = os.path.basename(file.filename)
@@ -249,46 +266,109 @@ async def upload_churners(files: list[UploadFile] = File(...)):
         ):
             raise HTTPException(status_code=400, detail="Required files missing")
 
-        # Read and process data
-        process_excel_files(
+        # Yüklenen TÜFE tablosu pipeline'ın kullanacağı store'a yazılır
+        seed_cpi_table(inflation_file)
+
+        job_id = submit_job(
+            run_pipeline_job,
             uyelik_file,
             musteriler_file,
             iptal_listesi_file,
-            inflation_file,
-            AKTİVİTELER_DIR,
-            GİRİŞ_ÇIKIŞ_DIR,
-            PROCESSED_DIR,
+            run_inputs_dir(run_dir, AKTİVİTELER_DIR),
+            run_inputs_dir(run_dir, GİRİŞ_ÇIKIŞ_DIR),
+            run_dir,
+            CUTOFF_DATE,
+            export_format,
         )
+        return job_status(job_id)
+    except Exception as e:
+        shutil.rmtree(run_dir, ignore_errors=True)
+        logger.exception(e)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        zip_path = os.path.join(PROCESSED_DIR, "processed_files.zip")
-        print(f"Zip path: {zip_path}")
 
-        # Create the zip file
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            # Walk through the directory
-            for root, dirs, files in os.walk(PROCESSED_DIR):
-                for file in files:
-                    # Full file path
-                    file_path = os.path.join(root, file)
+@app.post("/score")
+def score(request: ScoreRequest):
+    # Bellekteki modelle anlık puanlama; dosya yükleme ve iş kuyruğu yok
+    try:
+        model = resident_model()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-                    # Skip adding the zip file itself
-                    if file_path == zip_path:
-                        continue
+    try:
+        scores = score_records(request.contracts, model)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid contract data: {e}")
+    return {"model_version": model["version"], "scores": scores}
+
+
+@app.post("/score/batch")
+async def score_batch(
+    request: Request, batch_format: str = Query("csv", alias="format")
+):
+    # Gövde CSV (başlıklı) ya da NDJSON satırları; önce geçici dosyaya alınıp
+    # doğrulanır (hatalıysa 422), sonra sabit boyutlu parçalar halinde
+    # puanlanıp aynı formatta akıtılır
+    if batch_format not in BATCH_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid format. Expected one of: {', '.join(BATCH_FORMATS)}",
+        )
+    try:
+        model = resident_model()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    body = await spool_body(request.stream())
+    try:
+        await run_in_threadpool(validate_batch, body, batch_format, model)
+    except (TypeError, ValueError) as e:
+        body.close()
+        raise HTTPException(status_code=422, detail=f"Invalid contract data: {e}")
+    return StreamingResponse(
+        stream_scores(body, batch_format, model),
+        media_type=BATCH_FORMATS[batch_format],
+        headers={"X-Model-Version": model["version"]},
+    )
+
+
+def _zip_response(artifacts: list[tuple[str, str]], filename: str):
+    # Zip diske yazılmadan, sıkıştırıldıkça gönderilir
+    return StreamingResponse(
+        stream_zip(artifacts),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
-                    # Calculate relative path
-                    relative_path = os.path.relpath(file_path, PROCESSED_DIR)
 
-                    # Add file to zip
-                    print(f"Adding file: {file_path}")
-                    zip_file.write(file_path, relative_path)
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: str):
+    status = job_status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return status
 
-        print(f"Zip file created successfully at: {zip_path}")
-        return FileResponse(
-            zip_path, filename="processed_files.zip", media_type="application/zip"
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    status = job_status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if status["status"] in ("queued", "running"):
+        raise HTTPException(
+            status_code=409, detail=f"Job {job_id} is {status['status']}"
         )
-    except Exception as e:
-        logger.exception(e)
-        raise HTTPException(status_code=500, detail=str(e))
+    if status["status"] != "finished":
+        raise HTTPException(status_code=500, detail=status["error"] or status["status"])
+
+    # Çalışma klasörü saklama politikasıyla silinmiş olabilir
+    run_dir = get_job(job_id)["future"].result()
+    artifacts = list_artifacts(run_dir) if is_run_complete(run_dir) else []
+    if not artifacts:
+        raise HTTPException(
+            status_code=410, detail=f"Results of job {job_id} are no longer available"
+        )
+    return _zip_response(artifacts, "processed_files.zip")
 
 
 @app.get("/show-excel")
@@ -298,21 +378,21 @@ def show_excel():
         "logistic_regression_coefficients.xlsx",
     ]
 
+    # Dosyalar en son tamamlanmış çalışmadan alınır
+    latest_file = latest_run_file(excel_files[0])
+    if not latest_file:
+        raise HTTPException(status_code=404, detail=f"{excel_files[0]} not found")
+    run_dir = os.path.dirname(latest_file)
+
     # Check that all files exist
     for file_name in excel_files:
-        file_path = os.path.join(PROCESSED_DIR, file_name)
+        file_path = os.path.join(run_dir, file_name)
         if not os.path.exists(file_path):
             raise HTTPException(status_code=404, detail=f"{file_name} not found")
 
-    # Create a ZIP archive containing the Excel files
-    zip_path = os.path.join(PROCESSED_DIR, "excel_files.zip")
-    with zipfile.ZipFile(zip_path, "w") as zipf:
-        for file_name in excel_files:
-            file_path = os.path.join(PROCESSED_DIR, file_name)
-            zipf.write(file_path, arcname=file_name)
-
-    return FileResponse(
-        zip_path, filename="excel_files.zip", media_type="application/zip"
+    return _zip_response(
+        [(os.path.join(run_dir, file_name), file_name) for file_name in excel_files],
+        "excel_files.zip",
     )
 
 
@@ -321,13 +401,10 @@ def baseCustomer_excel():
     excel_file = "base_profile.xlsx"
 
     # Check that all files exist
-    file_path = os.path.join(PROCESSED_DIR, excel_file)
-    if not os.path.exists(file_path):
+    file_path = latest_run_file(excel_file)
+    if not file_path:
         raise HTTPException(status_code=404, detail=f"{excel_file} not found")
 
-    # Create a ZIP archive containing the Excel files
-    file_path = os.path.join(PROCESSED_DIR, "base_profile.xlsx")
-
     return FileResponse(
         file_path, filename="base_profile.xlsx", media_type="application/zip"
     )
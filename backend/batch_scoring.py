@@ -0,0 +1,126 @@
+import json
+import tempfile
+
+import pandas as pd
+from pandas.errors import EmptyDataError
+
+from model_server import SCORE_COLUMNS, score_contracts
+
+# format -> içerik tipi; cevap istekle aynı formatta döner
+BATCH_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Bellekte aynı anda tutulan en fazla satır; gönderilen dosyanın boyutundan
+# bağımsız olarak bellek kullanımı bu parça boyutuyla sınırlı kalır
+BATCH_CHUNK_ROWS = 5_000
+
+# İstek gövdesi bu boyuta kadar bellekte, üstü geçici dosyada tutulur
+SPOOL_MAX_BYTES = 8 << 20
+
+
+async def spool_body(chunks, max_size: int = SPOOL_MAX_BYTES):
+    # Cevaba başlamadan önce gövdenin tamamı okunur: istemci gövdeyi
+    # göndermeyi bitirmeden cevap okumuyorsa (requests, curl) iki taraf
+    # birbirini beklemez
+    spool = tempfile.SpooledTemporaryFile(max_size=max_size)
+    try:
+        async for chunk in chunks:
+            spool.write(chunk)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+def _csv_frames(body, chunk_rows: int):
+    # Tüm değerler str okunur, sayısal alanları binning çevirir; tırnak
+    # içindeki satır sonlarını read_csv kendisi çözer
+    try:
+        yield from pd.read_csv(body, dtype=str, encoding="utf-8", chunksize=chunk_rows)
+    except EmptyDataError:
+        return
+
+
+def _ndjson_frames(body, chunk_rows: int):
+    records = []
+    for line in body:
+        if not line.strip():
+            continue
+        records.append(json.loads(line))
+        if len(records) >= chunk_rows:
+            yield pd.DataFrame.from_records(records)
+            records = []
+    if records:
+        yield pd.DataFrame.from_records(records)
+
+
+def _frames(body, batch_format: str, chunk_rows: int):
+    if batch_format == "csv":
+        return _csv_frames(body, chunk_rows)
+    return _ndjson_frames(body, chunk_rows)
+
+
+def _first_non_number(values: pd.Series):
+    # apply_bins'in float dönüşümüne uymayan ilk değer ve satırı; değer değer
+    # yalnızca toplu dönüşüm başarısızsa bakılır
+    try:
+        values.to_numpy(dtype=float)
+        return None
+    except (TypeError, ValueError):
+        pass
+    for position, value in enumerate(values):
+        if value is None:
+            continue
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            return position, value
+    return None
+
+
+def validate_batch(
+    body, batch_format: str, model: dict, chunk_rows: int = BATCH_CHUNK_ROWS
+) -> None:
+    # Cevap akmaya başlamadan gövde bir kez baştan sona okunur: bozuk satır ya
+    # da sayıya çevrilemeyen ham değer burada ValueError verir; akış başladıktan
+    # sonra hata olursa istemci yalnızca yarım kalmış bir 200 görür
+    row = 0
+    for frame in _frames(body, batch_format, chunk_rows):
+        for column in model["bins"]:
+            if column not in frame.columns:
+                continue
+            invalid = _first_non_number(frame[column])
+            if invalid is not None:
+                position, value = invalid
+                raise ValueError(
+                    f"row {row + position + 1}: {column!r} is not a number: {value!r}"
+                )
+        row += len(frame)
+    body.seek(0)
+
+
+def stream_scores(
+    body, batch_format: str, model: dict, chunk_rows: int = BATCH_CHUNK_ROWS
+):
+    # body: spool_body'nin döndürdüğü, validate_batch'ten geçmiş dosya. Her
+    # parça okunup puanlanır ve gönderilir; model istek boyunca aynı kalır,
+    # dosya sonunda kapanır
+    try:
+        write_header = True
+        for frame in _frames(body, batch_format, chunk_rows):
+            scores = score_contracts(frame, model)
+            if batch_format == "csv":
+                yield scores.to_csv(index=False, header=write_header).encode("utf-8")
+                write_header = False
+            else:
+                # to_json float'ları 10 haneye yuvarlar; json.dumps tam değeri yazar
+                scores = scores.astype(object).where(scores.notna(), None)
+                yield "".join(
+                    json.dumps(record, ensure_ascii=False) + "\n"
+                    for record in scores.to_dict("records")
+                ).encode("utf-8")
+
+        if batch_format == "csv" and write_header:
+            yield (",".join(SCORE_COLUMNS) + "\n").encode("utf-8")
+    finally:
+        body.close()
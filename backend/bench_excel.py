@@ -0,0 +1,66 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from excel_reader import FAST_ENGINE, engine_name, read_excel
+
+# Kullanım: python bench_excel.py uploads --repeat 3
+# Her workbook'u mevcut motorlarla (cache'siz) okur, süreleri ve sonuçların
+# varsayılan motorla aynı olup olmadığını yazdırır
+
+
+def _workbooks(folder: str) -> list[str]:
+    paths = []
+    for root, dirs, files in os.walk(folder):
+        for file in files:
+            if file.endswith((".xls", ".xlsx")):
+                paths.append(os.path.join(root, file))
+    return sorted(paths)
+
+
+def _timed_read(path: str, engine, repeat: int):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = read_excel(path, engine=engine)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return df, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder", nargs="?", default="uploads")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    engines = [None] + ([FAST_ENGINE] if FAST_ENGINE else [])
+    if not FAST_ENGINE:
+        print("python-calamine is not installed, only the default engine is timed")
+
+    totals = {engine_name(engine): 0.0 for engine in engines}
+    for path in _workbooks(args.folder):
+        baseline, baseline_time = _timed_read(path, None, args.repeat)
+        totals["default"] += baseline_time
+        line = f"{os.path.relpath(path, args.folder)}: default {baseline_time:.2f}s"
+
+        for engine in engines[1:]:
+            df, elapsed = _timed_read(path, engine, args.repeat)
+            totals[engine_name(engine)] += elapsed
+            try:
+                pd.testing.assert_frame_equal(df, baseline, check_dtype=False)
+                same = "same"
+            except AssertionError:
+                same = "DIFFERS"
+            line += (
+                f", {engine} {elapsed:.2f}s ({baseline_time / elapsed:.1f}x, {same})"
+            )
+        print(line)
+
+    print("Total: " + ", ".join(f"{name} {t:.2f}s" for name, t in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
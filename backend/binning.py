@@ -0,0 +1,112 @@
+import json
+import math
+import os
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+# Aralıklara bölünen sayısal kolonlar; modele "<kolon>_Range" olarak girer
+BINNED_COLUMNS = [
+    "Sözleşme Yaşı",
+    "Aranma Sayısı",
+    "Overall Usage Percentage (%)",
+    "Last 30 Days Utilization (%)",
+    "Average_Visit_Duration",
+    "Unit Price (TL per day)",
+    "Renewal Percentage",
+    "Number of Past Renewals",
+]
+
+# Quantile yerine sabit sınırlarla bölünen kolonlar
+CUSTOM_RANGES = {"Last 30 Days Utilization (%)": [0, 1, 30, 100]}
+
+# Çalışma klasöründe saklanan sınır dosyası
+BINS_FILE = "bins.json"
+
+# Bump when the stored bins layout changes
+BINS_VERSION = "1"
+
+
+def _range_labels(edges: list) -> list[str]:
+    return [f"[{edges[i]:.2f}-{edges[i + 1]:.2f})" for i in range(len(edges) - 1)]
+
+
+def fit_bins(
+    df: pd.DataFrame,
+    num_ranges: int,
+    columns: list[str] = BINNED_COLUMNS,
+    custom_ranges: dict[str, list] = CUSTOM_RANGES,
+) -> dict[str, dict]:
+    # Kolon -> {"edges", "labels"}; pd.qcut(q=num_ranges, duplicates="drop")
+    # ile aynı sınırlar, quantile'lar kolon başına bir kez hesaplanır
+    bins = {}
+    for column in columns:
+        try:
+            if column in custom_ranges:
+                edges = list(custom_ranges[column])
+            else:
+                quantiles = (
+                    df[column].dropna().quantile(np.linspace(0, 1, num_ranges + 1))
+                )
+                edges = pd.unique(quantiles.to_numpy()).tolist()
+
+            labels = _range_labels(edges)
+            if len(set(labels)) != len(labels):
+                raise ValueError(f"duplicate range labels {labels}")
+            bins[column] = {"edges": edges, "labels": labels}
+        except Exception as e:
+            print(f"Error processing column '{column}': {e}")
+    return bins
+
+
+def apply_bins(df: pd.DataFrame, bins: dict[str, dict]) -> pd.DataFrame:
+    # Sağdan kapalı aralıklar, ilk aralık alt sınırı da içerir (pd.cut
+    # include_lowest=True gibi); sınırların dışındaki ve boş değerler NaN
+    df = df.copy()
+    for column, spec in bins.items():
+        if column not in df.columns:
+            continue
+        edges = np.asarray(spec["edges"], dtype=float)
+        values = df[column].to_numpy(dtype=float)
+
+        ids = np.searchsorted(edges, values, side="left")
+        ids[values == edges[0]] = 1
+        codes = ids - 1
+        codes[np.isnan(values) | (ids == 0) | (ids == len(edges))] = -1
+
+        df[f"{column}_Range"] = pd.Categorical.from_codes(
+            codes, categories=spec["labels"], ordered=True
+        )
+    return df
+
+
+def range_label(value, spec: dict):
+    # apply_bins'in tek değer karşılığı; aralık dışı ya da boş değer -> None
+    if value is None:
+        return None
+    value = float(value)
+    edges = spec["edges"]
+    if math.isnan(value):
+        return None
+    position = 1 if value == edges[0] else bisect_left(edges, value)
+    if position == 0 or position == len(edges):
+        return None
+    return spec["labels"][position - 1]
+
+
+def save_bins(bins: dict[str, dict], path: str) -> str:
+    payload = {"version": BINS_VERSION, "columns": bins}
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_bins(path: str) -> dict[str, dict]:
+    with open(path) as f:
+        payload = json.load(f)
+    if payload.get("version") != BINS_VERSION:
+        raise ValueError(f"Unsupported bins version in {path}")
+    return payload["columns"]
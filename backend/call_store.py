@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from excel_cache import (
+    find_frame,
+    manifest_digest,
+    prune_parts,
+    read_excel_cached,
+    read_part,
+    write_frame,
+)
+from interval_join import assign_intervals
+from excel_reader import engine_name
+from pipeline import dir_digest
+from parallel_reader import read_excel_files
+
+STORE_DIR = "cache/aktivite"
+MANIFEST_FILE = "manifest.json"
+
+# Bump when the stored call or count layout changes
+STORE_VERSION = "1"
+
+# Aranma sayısı için yalnızca müşteri kodu ve arama tarihi gerekir
+CALL_COLUMNS = ["Kodu", "Tarih"]
+CONTRACT_COLUMNS = ["Müşteri Kodu", "Başlangıç T.", "Ek Süreli Bitiş T.", "Sözleşme No"]
+
+
+def _load_manifest(store_dir: str) -> dict:
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except Exception as e:
+        print(f"Manifest {manifest_path} could not be read, rebuilding: {e}")
+        return {}
+    # Parts parsed with another spreadsheet engine are rebuilt
+    if (
+        manifest.get("version") != STORE_VERSION
+        or manifest.get("engine", "default") != engine_name()
+    ):
+        return {}
+    return manifest.get("files", {})
+
+
+def _save_manifest(store_dir: str, files: dict) -> None:
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": STORE_VERSION, "engine": engine_name(), "files": files},
+            f,
+            indent=2,
+        )
+    os.replace(tmp_path, manifest_path)
+
+
+def _contracts_digest(contracts: pd.DataFrame) -> str:
+    # Sıra da önemli: eşit başlangıçlarda ilk sözleşme seçiliyor
+    hashes = pd.util.hash_pandas_object(contracts[CONTRACT_COLUMNS], index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()[:16]
+
+
+def _read_calls(file_path: str) -> pd.DataFrame:
+    calls = read_excel_cached(file_path)[CALL_COLUMNS]
+    calls["Tarih"] = pd.to_datetime(calls["Tarih"])
+    return calls
+
+
+def _count_calls(calls: pd.DataFrame, contracts: pd.DataFrame) -> pd.DataFrame:
+    # Her arama müşterinin o tarihi kapsayan sözleşmesine sayılır
+    contract_no = assign_intervals(
+        calls, contracts, event_key="Kodu", event_time="Tarih"
+    )
+    counts = contract_no.value_counts()
+    return pd.DataFrame(
+        {"Sözleşme No": counts.index, "Aranma Sayısı": counts.to_numpy()}
+    )
+
+
+def reports_digest(aktiviteler_dir: str, store_dir: str = STORE_DIR) -> str:
+    # Aşama anahtarı: manifest'teki raporlar mtime / boyutla tanınır, yalnızca
+    # yeni ya da değişen dosyalar hash'lenir. Store sürümü de anahtarda:
+    # sürüm artınca aşama da yeniden çalışır
+    digest = dir_digest(aktiviteler_dir, _load_manifest(store_dir))
+    return f"{STORE_VERSION}.{digest}"
+
+
+def load_call_counts(
+    aktiviteler_dir: str, contracts: pd.DataFrame, store_dir: str = STORE_DIR
+) -> pd.Series:
+    # Sözleşme No -> aranma sayısı. Her rapor bir kez okunur; sayımlar rapor
+    # ve sözleşme tablosu değişmedikçe store'dan gelir
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = _load_manifest(store_dir)
+    contracts_digest = _contracts_digest(contracts)
+
+    reports = []
+    for file_name in os.listdir(aktiviteler_dir):
+        if not file_name.endswith((".xlsx", ".xls")):
+            continue
+        file_path = os.path.join(aktiviteler_dir, file_name)
+        try:
+            stat = os.stat(file_path)
+            digest = manifest_digest(file_path, stat, manifest.get(file_name))
+            reports.append((file_name, file_path, stat, digest))
+        except Exception as e:
+            print(f"{file_name} okunurken bir hata oluştu: {e}")
+
+    # Store sürümü ve motor parça adında: STORE_VERSION artınca ya da motor
+    # değişince eski parçalar bulunmaz, raporlar yeniden okunur
+    part_key = f"{STORE_VERSION}.{engine_name()}"
+
+    def _calls_name(digest):
+        return f"{digest}.{part_key}.calls"
+
+    def _counts_name(digest):
+        return f"{digest}.{contracts_digest}.{part_key}.counts"
+
+    def _calls_base(digest):
+        return os.path.join(store_dir, _calls_name(digest))
+
+    def _counts_base(digest):
+        return os.path.join(store_dir, _counts_name(digest))
+
+    # Ne sayımı ne de arama kaydı saklı olan raporlar paralel okunur
+    unstored = [
+        file_path
+        for _, file_path, _, digest in reports
+        if not find_frame(_counts_base(digest)) and not find_frame(_calls_base(digest))
+    ]
+    parsed = read_excel_files(unstored, reader=_read_calls)
+
+    files = {}
+    live = set()
+    parts = []
+    for file_name, file_path, stat, digest in reports:
+        try:
+            counts = read_part(_counts_base(digest))
+            if counts is None:
+                calls = read_part(_calls_base(digest))
+                if calls is None:
+                    if file_path in parsed:
+                        calls = parsed[file_path]
+                    elif file_path in unstored:
+                        continue
+                    else:
+                        # Parça okunmadan önce silindi; rapor yeniden okunur
+                        calls = _read_calls(file_path)
+                    write_frame(calls, _calls_base(digest))
+                    print(f"Processed file: {file_path}")
+                counts = _count_calls(calls, contracts)
+                write_frame(counts, _counts_base(digest))
+
+            files[file_name] = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "sha256": digest,
+            }
+            live.update({_calls_name(digest), _counts_name(digest)})
+            parts.append(counts)
+        except Exception as e:
+            print(f"{file_name} okunurken bir hata oluştu: {e}")
+
+    _save_manifest(store_dir, files)
+
+    # Silinen raporların ve eski sözleşme tablolarının parçaları atılır
+    prune_parts(store_dir, live)
+
+    if not parts:
+        return pd.Series(dtype="int64", name="Aranma Sayısı")
+
+    return (
+        pd.concat(parts, ignore_index=True)
+        .groupby("Sözleşme No", sort=False)["Aranma Sayısı"]
+        .sum()
+    )
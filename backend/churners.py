@@ -1,10 +1,11 @@
 import pandas as pd
 import os
-import numpy as np
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
 import warnings
+from excel_reader import read_excel
+from scoring import build_coefficient_index, score_customers
 
 warnings.filterwarnings("ignore")
 
@@ -19,7 +20,7 @@ def find_churners(
 ):
     os.makedirs(output_dir, exist_ok=True)
 
-    customer_df = pd.read_excel(customer_file_path)
+    customer_df = read_excel(customer_file_path)
     cutoff = pd.to_datetime("2025-01-01")
 
     pending = customer_df[
@@ -27,28 +28,20 @@ def find_churners(
         & (pd.to_datetime(customer_df["Ek Süreli Bitiş T."], errors="coerce") <= cutoff)
     ].copy()
 
-    coef_df = pd.read_excel(coefficients_file_path)
-    coef_df.set_index("Feature", inplace=True)
-    scores = pending[["Sözleşme No"] + categorical_columns].copy()
-    scores["Score"] = intercept
-
-    for col in categorical_columns:
-        for i, row in scores.iterrows():
-            key = f"{col}_{row[col]}"
-            if key in coef_df.index:
-                scores.at[i, "Score"] += coef_df.loc[key, "Coefficient"]
-
-    scores["Probability"] = 1 / (1 + np.exp(-scores["Score"]))
-    scores["Class_0.5"] = (scores["Probability"] >= 0.5).astype(int)
+    coef_df = read_excel(coefficients_file_path)
+    scores = score_customers(
+        pending,
+        build_coefficient_index(coef_df, categorical_columns),
+        intercept,
+        categorical_columns,
+    )
 
+    df_exp = scores.sort_values("Probability", ascending=False).reset_index(drop=True)
     result_path = os.path.join(output_dir, "customer_probabilities_and_classes.xlsx")
-    scores.sort_values("Probability", ascending=False).to_excel(
-        result_path, index=False
-    )
+    df_exp.to_excel(result_path, index=False)
 
     # 2. Detect renewed contracts
-    df_exp = pd.read_excel(result_path)
-    df_new = pd.read_excel(file_recent)
+    df_new = read_excel(file_recent)
 
     df_new["Başlangıç T."] = pd.to_datetime(
         df_new["Başlangıç T."], errors="coerce", dayfirst=True
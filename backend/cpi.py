@@ -0,0 +1,191 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import requests
+
+from excel_cache import find_frame, read_frame, write_frame
+from excel_reader import read_excel
+
+# TÜİK Tüketici Fiyat Endeksi tablosu
+CPI_URL = "https://data.tuik.gov.tr/Bulten/DownloadIstatistikselTablo?p=VbZnKRKuqHltfgm6LftGQSYqYlk/uPE2vMOyUf0LUPBBo1cKgBWHc1stJWf1n5Mv"
+CPI_FILE_NAME = "tuketici fiyat endeksi ve degisim oranlari.xls"
+
+CPI_DIR = "cache/cpi"
+CURRENT_FILE = "current.json"
+
+# Bump when parse_cpi_table changes so stored tables are re-parsed
+CPI_STORE_VERSION = "1"
+
+# Yenileme sıklığı ve TÜİK isteği için üst süre
+CPI_TTL_SECONDS = 7 * 24 * 3600
+CPI_TIMEOUT_SECONDS = 15
+
+_lookup_cache = {}
+_refresh_lock = threading.Lock()
+
+
+def parse_cpi_table(source) -> pd.DataFrame:
+    # source: dosya yolu ya da indirilen xls'in byte'ları
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    xls = read_excel(source, sheet_name=0, skiprows=4, nrows=21)
+
+    # Clean CPI table
+    xls.columns = xls.columns.map(str).str.strip()
+    xls = xls.dropna(how="all", axis=1).dropna(how="all", axis=0)
+    xls.rename(columns={xls.columns[0]: "Year"}, inplace=True)
+    xls["Year"] = pd.to_numeric(xls["Year"], errors="coerce")
+    return xls.set_index("Year")
+
+
+def _read_current(cpi_dir: str):
+    try:
+        with open(os.path.join(cpi_dir, CURRENT_FILE)) as f:
+            current = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if current.get("store_version") != CPI_STORE_VERSION:
+        return None
+    return current
+
+
+def _write_current(current: dict, cpi_dir: str) -> None:
+    tmp_path = os.path.join(cpi_dir, f"{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(cpi_dir, CURRENT_FILE))
+
+
+def store_cpi_table(content: bytes, source: str, cpi_dir: str = CPI_DIR) -> str:
+    # Her farklı tablo içeriği ayrı bir versiyon olarak saklanır,
+    # current.json en son kaydedileni gösterir
+    version = hashlib.sha256(content).hexdigest()[:16]
+    base_path = os.path.join(cpi_dir, version)
+    if not find_frame(base_path):
+        write_frame(parse_cpi_table(content), base_path)
+
+    _write_current(
+        {
+            "store_version": CPI_STORE_VERSION,
+            "version": version,
+            "source": source,
+            "stored_at": time.time(),
+        },
+        cpi_dir,
+    )
+    print(f"CPI table {version} stored from {source}")
+    return version
+
+
+def seed_cpi_table(path: str, cpi_dir: str = CPI_DIR) -> str:
+    # Yüklenen TÜİK xls dosyasından
+    with open(path, "rb") as f:
+        return store_cpi_table(f.read(), os.path.basename(path), cpi_dir)
+
+
+def fetch_cpi_table(
+    cpi_dir: str = CPI_DIR, timeout: float = CPI_TIMEOUT_SECONDS
+) -> str:
+    response = requests.get(CPI_URL, timeout=timeout)
+    response.raise_for_status()
+    return store_cpi_table(response.content, CPI_URL, cpi_dir)
+
+
+def cpi_table_is_stale(cpi_dir: str = CPI_DIR, ttl: float = CPI_TTL_SECONDS) -> bool:
+    current = _read_current(cpi_dir)
+    return current is None or time.time() - current["stored_at"] > ttl
+
+
+def refresh_cpi_table(cpi_dir: str = CPI_DIR, ttl: float = CPI_TTL_SECONDS) -> None:
+    # TTL dolduysa TÜİK'ten yenile; hata olursa eldeki tablo kullanılmaya devam eder
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    try:
+        if cpi_table_is_stale(cpi_dir, ttl):
+            fetch_cpi_table(cpi_dir)
+    except Exception as e:
+        print(f"CPI refresh failed, keeping the stored table: {e}")
+    finally:
+        _refresh_lock.release()
+
+
+def start_cpi_refresh(cpi_dir: str = CPI_DIR) -> None:
+    # API tarafında arka planda; pipeline ağ isteğini beklemez
+    if cpi_table_is_stale(cpi_dir):
+        threading.Thread(target=refresh_cpi_table, args=(cpi_dir,), daemon=True).start()
+
+
+def cpi_table_stored(cpi_dir: str = CPI_DIR) -> bool:
+    return _read_current(cpi_dir) is not None
+
+
+def load_cpi_lookup(cpi_dir: str = CPI_DIR) -> pd.DataFrame:
+    # Year index'li, ay kolonlu TÜFE tablosu; process başına bellekte tutulur.
+    # Ağa gitmez: TÜİK'ten yalnızca arka plandaki yenileme indirir
+    current = _read_current(cpi_dir)
+    if current is None:
+        raise FileNotFoundError(
+            f"No CPI table stored in {cpi_dir}, upload the TÜİK xls ({CPI_FILE_NAME})"
+        )
+
+    version = current["version"]
+    if version not in _lookup_cache:
+        path = find_frame(os.path.join(cpi_dir, version))
+        if path is None:
+            raise FileNotFoundError(f"CPI table {version} missing from {cpi_dir}")
+        _lookup_cache.clear()
+        _lookup_cache[version] = read_frame(path)
+
+    stored_at = datetime.fromtimestamp(current["stored_at"])
+    print(f"Using CPI table {version} ({current['source']}, {stored_at:%Y-%m-%d})")
+    return _lookup_cache[version]
+
+
+def cpi_index_table(cpi_lookup: pd.DataFrame):
+    # (yıl, ay) -> endeks dizisi: satır = yıl, kolon = ay (pozisyonel)
+    # Tekrarlanan yıllar belirsiz olduğu için tabloda yokmuş gibi sayılır
+    years = cpi_lookup.index
+    year_rows = pd.Series(np.arange(len(years)), index=years)
+    year_rows = year_rows[~years.duplicated(keep=False)]
+    table = cpi_lookup.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    return year_rows, table
+
+
+def adjust_amounts(
+    start_dates: pd.Series, amounts: pd.Series, cpi_lookup: pd.DataFrame
+) -> np.ndarray:
+    # Tutar * (son endeks / başlangıç ayının endeksi). Tarih yoksa, tutar 0
+    # ise, yıl tabloda yoksa ya da başlangıç endeksi boş/0 ise tutar aynen
+    # kalır. Son endeks: tablonun son satırındaki son dolu değer
+    year_rows, table = cpi_index_table(cpi_lookup)
+    amounts = pd.to_numeric(amounts, errors="coerce").to_numpy(dtype=float)
+    adjusted = amounts.copy()
+
+    last_row = table[-1][~np.isnan(table[-1])] if len(table) else []
+    if len(last_row) == 0:
+        return adjusted
+    latest_index = last_row[-1]
+
+    dates = pd.to_datetime(start_dates, errors="coerce", format="mixed")
+    rows = dates.dt.year.map(year_rows).to_numpy(dtype=float)
+    months = dates.dt.month.to_numpy(dtype=float)
+    valid = (
+        ~np.isnan(rows)
+        & ~np.isnan(months)
+        & (months <= table.shape[1])
+        & (amounts != 0)
+    )
+
+    start_index = np.full(len(amounts), np.nan)
+    start_index[valid] = table[rows[valid].astype(int), months[valid].astype(int) - 1]
+    valid &= ~np.isnan(start_index) & (start_index != 0)
+
+    adjusted[valid] = amounts[valid] * (latest_index / start_index[valid])
+    return adjusted
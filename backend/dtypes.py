@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+# Farklı değer sayısı satır sayısının bu oranını geçmeyen str kolonlar
+# category olur (ör. Üyelik Adı, Cinsiyet, Kodu); geri kalanlar object kalır
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _is_str_column(values: pd.Series) -> bool:
+    present = values.dropna()
+    return len(present) > 0 and present.map(type).eq(str).all()
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    max_category_ratio: float = CATEGORY_MAX_RATIO,
+    downcast_numeric: bool = True,
+) -> pd.DataFrame:
+    # Değerleri değiştirmeden daha küçük tiplere çevirir:
+    # - tekrar eden str kolonlar (isimler, ID'ler) -> category (int kodlar)
+    # - int -> en küçük int tipi
+    # - float -> float32, ancak her değer birebir korunuyorsa
+    # downcast_numeric=False: sayısal kolonlar olduğu gibi kalır; üzerinde
+    # hesap yapılan frame'lerde float32 sonuçları değiştirir
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if values.dtype == object:
+            unique_count = values.nunique(dropna=True)
+            if unique_count <= max_category_ratio * len(values) and _is_str_column(
+                values
+            ):
+                columns[col] = values.astype("category")
+        elif not downcast_numeric:
+            continue
+        elif values.dtype.kind in "iu":
+            columns[col] = pd.to_numeric(values, downcast="integer")
+        elif values.dtype == np.float64:
+            as_float32 = values.astype(np.float32)
+            if np.array_equal(
+                as_float32.to_numpy(dtype=np.float64),
+                values.to_numpy(),
+                equal_nan=True,
+            ):
+                columns[col] = as_float32
+
+    if not columns:
+        return df
+    df = df.copy()
+    for col, values in columns.items():
+        df[col] = values
+    return df
+
+
+def str_categorical(values: pd.Series) -> pd.Series:
+    # values.astype(str).astype("category") ile aynı sonuç: str'e satırlar
+    # yerine yalnızca farklı değerler çevrilir, ara object kolon kurulmaz
+    codes, uniques = pd.factorize(values)
+    labels = pd.Series(uniques, dtype=values.dtype).astype(str).to_numpy(dtype=object)
+    missing = codes < 0
+    if missing.any():
+        # Boş değerin metni tipine bağlı ("nan", "None", "NaT")
+        missing_labels, missing_codes = np.unique(
+            values[missing].astype(str).to_numpy(dtype=object), return_inverse=True
+        )
+        codes[missing] = len(labels) + missing_codes
+        labels = np.concatenate([labels, missing_labels])
+    # Farklı değerler aynı metni verebilir (ör. 1 ve "1"); kategoriler tekilleşir
+    categories, label_codes = np.unique(labels, return_inverse=True)
+    return pd.Series(
+        pd.Categorical.from_codes(label_codes[codes], categories),
+        index=values.index,
+        name=values.name,
+    )
+
+
+def memory_mb(obj) -> float:
+    # Frame, Series ya da bunları içeren tuple/list için toplam bellek (MB)
+    if isinstance(obj, pd.DataFrame):
+        return obj.memory_usage(deep=True).sum() / 1e6
+    if isinstance(obj, pd.Series):
+        return obj.memory_usage(deep=True) / 1e6
+    if isinstance(obj, (tuple, list)):
+        return sum(memory_mb(item) for item in obj)
+    return 0.0
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from excel_reader import DEFAULT_ENGINE, read_excel
+
+CACHE_DIR = "cache/excel"
+
+# Bump when the cached layout changes so stale entries are ignored
+CACHE_VERSION = "1"
+
+# Her yükleme ve her çalışmanın test_db'si yeni bir girdi bırakır; bu kadar
+# süre okunmayan girdiler silinir (çalışma klasörlerinin saklama süresi)
+CACHE_MAX_IDLE_DAYS = 7
+
+# Store'larda artık kullanılmayan parçalar bu kadar süre dokunulmadan
+# kaldıktan sonra silinir; aynı store'u o anda okuyan başka bir çalışmanın
+# parçası silinmez
+PART_MAX_IDLE_DAYS = 1
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_digest(path: str, stat: os.stat_result, entry) -> str:
+    # Same name, mtime and size as the store manifest entry: trust the
+    # recorded hash and skip hashing
+    if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+        return entry["sha256"]
+    return file_digest(path)
+
+
+def _cache_key(path: str, engine, read_kwargs: dict) -> str:
+    key = hashlib.sha256()
+    key.update(CACHE_VERSION.encode())
+    # Varsayılan motorun anahtarı eskisiyle aynı kalır
+    if engine:
+        key.update(engine.encode())
+    key.update(file_digest(path).encode())
+    key.update(repr(sorted(read_kwargs.items())).encode())
+    return key.hexdigest()
+
+
+def _read_parquet(path: str) -> pd.DataFrame:
+    df = pd.read_parquet(path)
+    # Arrow gives None for missing strings, read_excel gives NaN
+    for col in df.select_dtypes(include="object").columns:
+        if df[col].isna().any():
+            df[col] = df[col].mask(df[col].isna(), np.nan)
+    return df
+
+
+def _write_atomic(df: pd.DataFrame, path: str, writer) -> None:
+    # Write to a temp file first so a concurrent reader never sees half a file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        writer(df, tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_frame(df: pd.DataFrame, base_path: str) -> str:
+    # Parquet when Arrow can hold the frame, pickle otherwise (e.g. a column
+    # mixing str and datetime, as "Giriş Saati" does in some giris files)
+    os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+    try:
+        path = f"{base_path}.parquet"
+        _write_atomic(df, path, lambda frame, p: frame.to_parquet(p))
+    except Exception:
+        path = f"{base_path}.pkl"
+        _write_atomic(df, path, lambda frame, p: frame.to_pickle(p))
+    return path
+
+
+def find_frame(base_path: str):
+    for ext in (".parquet", ".pkl"):
+        if os.path.exists(base_path + ext):
+            return base_path + ext
+    return None
+
+
+def read_frame(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return _read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def read_part(base_path: str):
+    # Store parçası okunurken mtime güncellenir (prune_parts için "kullanıldı").
+    # Parça yoksa ya da bu arada silindiyse None
+    path = find_frame(base_path)
+    if path is None:
+        return None
+    try:
+        os.utime(path)
+        return read_frame(path)
+    except FileNotFoundError:
+        return None
+
+
+def prune_parts(
+    store_dir: str, live: set, max_idle_days: float = PART_MAX_IDLE_DAYS
+) -> None:
+    # live: bu çalışmanın kullandığı parçalar. Diğerleri ancak max_idle_days
+    # boyunca hiçbir çalışma tarafından okunmadıysa silinir
+    expired = time.time() - max_idle_days * 86400
+    for name in os.listdir(store_dir):
+        stem, ext = os.path.splitext(name)
+        if ext not in (".parquet", ".pkl") or stem in live:
+            continue
+        path = os.path.join(store_dir, name)
+        try:
+            if os.path.getmtime(path) < expired:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def read_excel_cached(
+    path: str,
+    cache_dir: str = CACHE_DIR,
+    engine=DEFAULT_ENGINE,
+    max_idle_days: float = CACHE_MAX_IDLE_DAYS,
+    **read_kwargs,
+):
+    # Aynı içerikteki workbook bir kez parse edilir, sonrası cache'ten okunur.
+    # Okunan girdinin mtime'ı güncellenir; yeni girdi yazılırken
+    # max_idle_days boyunca okunmamış girdiler silinir
+    key = _cache_key(path, engine, read_kwargs)
+    base_path = os.path.join(cache_dir, key)
+
+    try:
+        df = read_part(base_path)
+        if df is not None:
+            return df
+    except Exception as e:
+        print(f"Cache entry for {path} could not be read, re-parsing: {e}")
+
+    df = read_excel(path, engine=engine, **read_kwargs)
+    try:
+        write_frame(df, base_path)
+        prune_parts(cache_dir, {key}, max_idle_days)
+    except Exception as e:
+        print(f"Could not cache {path}: {e}")
+
+    return df
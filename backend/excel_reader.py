@@ -0,0 +1,21 @@
+import pandas as pd
+
+# python-calamine (Rust) kuruluysa çok daha hızlı; yoksa pandas'ın varsayılanı
+# (xls için xlrd, xlsx için openpyxl) kullanılır
+try:
+    import python_calamine  # noqa: F401
+
+    FAST_ENGINE = "calamine"
+except ImportError:
+    FAST_ENGINE = None
+
+DEFAULT_ENGINE = FAST_ENGINE
+
+
+def engine_name(engine=DEFAULT_ENGINE) -> str:
+    # Cache anahtarları için; farklı motorlar farklı tipler döndürebilir
+    return engine or "default"
+
+
+def read_excel(path, engine=DEFAULT_ENGINE, **read_kwargs) -> pd.DataFrame:
+    return pd.read_excel(path, engine=engine, **read_kwargs)
@@ -0,0 +1,197 @@
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from openpyxl import Workbook
+
+from excel_cache import read_excel_cached
+
+# format -> dosya uzantısı
+EXPORT_FORMATS = {"xlsx": ".xlsx", "parquet": ".parquet", "csv": ".csv.gz"}
+DEFAULT_EXPORT_FORMAT = "xlsx"
+
+# Arayüz bu çıktıları workbook olarak okur; başka format istense de xlsx
+# kopyaları yazılır
+UI_ARTIFACTS = {
+    "customer_probabilities_and_classes",
+    "logistic_regression_coefficients",
+    "base_profile",
+}
+
+# Aynı anda yazılan çıktı sayısı. xlsx yazımı saf Python (openpyxl) olduğu
+# için thread'ler GIL'de sıraya girer; paralel yazım process'lerle yapılır
+MAX_EXPORT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Bundan kısa xlsx'ler ve diğer formatlar ana process'te yazılır; worker
+# başlatmak yazımdan uzun sürer
+PARALLEL_MIN_ROWS = 5_000
+
+# xlsx satırları bu büyüklükte parçalarla object'e çevrilip yazılır
+XLSX_CHUNK_ROWS = 10_000
+
+
+def _xlsx_rows(df: pd.DataFrame, index: bool):
+    for start in range(0, len(df), XLSX_CHUNK_ROWS):
+        chunk = df.iloc[start : start + XLSX_CHUNK_ROWS]
+        if index:
+            chunk = chunk.reset_index()
+        columns = []
+        for col in range(chunk.shape[1]):
+            values = chunk.iloc[:, col].astype(object).to_numpy()
+            # NaN / NaT -> boş hücre
+            values[pd.isna(values)] = None
+            columns.append(values)
+        yield from zip(*columns)
+
+
+def write_xlsx(
+    df: pd.DataFrame, path: str, sheet_name: str = "Sheet1", index: bool = False
+) -> None:
+    # openpyxl write-only: satırlar diske akıtılır, hücre nesneleri bellekte
+    # tutulmaz (to_excel tüm sayfayı bellekte kurar)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+
+    header = [str(col) for col in df.columns]
+    if index:
+        header = [df.index.name] + header
+    sheet.append(header)
+    for row in _xlsx_rows(df, index):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    # Parquet bir kolonda tek tip ister; "Assigned Interval" gibi str ve 0
+    # karışık kolonlar str'e çevrilir (skorlamada zaten str(değer) kullanılır)
+    mixed = [
+        col
+        for col in df.select_dtypes(include="object").columns
+        if df[col].dropna().map(type).nunique() > 1
+    ]
+    if not mixed:
+        return df
+    df = df.copy()
+    for col in mixed:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def artifact_path(output_dir: str, name: str, export_format: str) -> str:
+    return os.path.join(output_dir, name + EXPORT_FORMATS[export_format])
+
+
+def write_artifact(
+    df: pd.DataFrame,
+    path: str,
+    export_format: str,
+    sheet_name: str = "Sheet1",
+    index: bool = False,
+) -> str:
+    # Yarım dosya görünmesin diye önce geçici dosyaya yazılır
+    extension = EXPORT_FORMATS[export_format]
+    tmp_path = f"{path[: -len(extension)]}.{os.getpid()}.tmp{extension}"
+    try:
+        if export_format == "xlsx":
+            write_xlsx(df, tmp_path, sheet_name=sheet_name, index=index)
+        elif export_format == "parquet":
+            _arrow_safe(df).to_parquet(tmp_path, index=index)
+        else:
+            df.to_csv(tmp_path, index=index, compression="gzip")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def _write_artifact_file(
+    source_path: str, path: str, export_format: str, options: dict
+) -> str:
+    # Worker frame'i kendisi okur; havuza yalnızca dosya yolları gider
+    return write_artifact(pd.read_pickle(source_path), path, export_format, **options)
+
+
+def _write_parallel(
+    pooled: list, local: list, max_workers: int, tmp_dir: str
+) -> list[str]:
+    # pooled: worker'larda yazılır, her frame önce pickle dosyasına konur;
+    # local: bu sırada ana process'te yazılır. spawn: job worker'ı fork edilmez
+    paths = []
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(pooled)),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        futures = []
+        for i, (df, path, fmt, options) in enumerate(pooled):
+            source_path = os.path.join(tmp_dir, f"{i}.pkl")
+            df.to_pickle(source_path)
+            futures.append(
+                executor.submit(_write_artifact_file, source_path, path, fmt, options)
+            )
+        for df, path, fmt, options in local:
+            paths.append(write_artifact(df, path, fmt, **options))
+        for future in as_completed(futures):
+            paths.append(future.result())
+    return paths
+
+
+def export_artifacts(
+    output_dir: str,
+    artifacts: list[tuple[str, pd.DataFrame, dict]],
+    export_format: str = DEFAULT_EXPORT_FORMAT,
+    max_workers: int = MAX_EXPORT_WORKERS,
+) -> list[str]:
+    # artifacts: (uzantısız isim, frame, write_artifact seçenekleri);
+    # birbirinden bağımsız oldukları için paralel yazılır
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    writes = []
+    for name, df, options in artifacts:
+        formats = [export_format]
+        if name in UI_ARTIFACTS and export_format != "xlsx":
+            formats.append("xlsx")
+        for fmt in formats:
+            writes.append((df, artifact_path(output_dir, name, fmt), fmt, options))
+
+    # Yalnızca uzun xlsx yazımları paralelleşmeye değer (bkz. PARALLEL_MIN_ROWS)
+    pooled, local = [], []
+    for write in writes:
+        df, _, fmt, _ = write
+        if fmt == "xlsx" and len(df) >= PARALLEL_MIN_ROWS:
+            pooled.append(write)
+        else:
+            local.append(write)
+
+    if max_workers <= 1 or len(pooled) < 2:
+        paths = [
+            write_artifact(df, path, fmt, **options)
+            for df, path, fmt, options in writes
+        ]
+    else:
+        with tempfile.TemporaryDirectory(dir=output_dir, prefix=".export-") as tmp:
+            paths = _write_parallel(pooled, local, max_workers, tmp)
+
+    for path in paths:
+        print(f"Exported {path}")
+    return paths
+
+
+def artifact_format(path: str):
+    for export_format, extension in EXPORT_FORMATS.items():
+        if path.endswith(extension):
+            return export_format
+    return None
+
+
+def read_artifact(path: str) -> pd.DataFrame:
+    # Önceki bir çalışmanın çıktısını formatına göre okur
+    export_format = artifact_format(path)
+    if export_format == "parquet":
+        return pd.read_parquet(path)
+    if export_format == "csv":
+        return pd.read_csv(path)
+    return read_excel_cached(path)
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+
+def _composite(keys: np.ndarray, ranks: np.ndarray, n_ranks: int) -> np.ndarray:
+    # (müşteri, zaman) çiftini tek bir sıralanabilir int64 değere çevir
+    return keys.astype(np.int64) * (n_ranks + 1) + ranks
+
+
+def _time_ranks(*arrays: np.ndarray):
+    # Dense rank over every timestamp involved so ranks fit next to the key
+    values = np.concatenate(arrays)
+    uniques, inverse = np.unique(values, return_inverse=True)
+    ranks = np.split(inverse, np.cumsum([len(a) for a in arrays])[:-1])
+    return ranks, len(uniques)
+
+
+def _ns(times: pd.Series) -> np.ndarray:
+    return times.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _prepare(events, contracts, event_key, event_time, contract_key, start, end):
+    event_times = pd.to_datetime(events[event_time], errors="coerce")
+    starts = pd.to_datetime(contracts[start], errors="coerce")
+    ends = pd.to_datetime(contracts[end], errors="coerce")
+
+    # Null key or dates never satisfy the original <= / >= comparisons
+    valid_contract = (
+        contracts[contract_key].notna().to_numpy()
+        & starts.notna().to_numpy()
+        & ends.notna().to_numpy()
+    )
+    codes, uniques = pd.factorize(contracts[contract_key][valid_contract])
+    event_codes = pd.Index(uniques).get_indexer(events[event_key])
+    valid_event = (event_codes >= 0) & event_times.notna().to_numpy()
+
+    return (
+        np.flatnonzero(valid_contract),
+        codes,
+        _ns(starts)[valid_contract],
+        _ns(ends)[valid_contract],
+        valid_event,
+        event_codes,
+        _ns(event_times),
+    )
+
+
+def assign_intervals(
+    events: pd.DataFrame,
+    contracts: pd.DataFrame,
+    event_key: str,
+    event_time: str,
+    contract_key: str = "Müşteri Kodu",
+    start: str = "Başlangıç T.",
+    end: str = "Ek Süreli Bitiş T.",
+    value: str = "Sözleşme No",
+) -> pd.Series:
+    # Her olay için aynı müşterinin start <= t <= end aralığını kapsayan ilk
+    # sözleşmeyi (frame sırasıyla) bulur, eşleşme yoksa None; eski
+    # contracts[(...) & (...)].iloc[0] döngüsüyle aynı sonuç, sıralama şartı yok
+    (
+        positions,
+        codes,
+        starts,
+        ends,
+        valid_event,
+        event_codes,
+        event_times,
+    ) = _prepare(events, contracts, event_key, event_time, contract_key, start, end)
+
+    result = np.full(len(events), None, dtype=object)
+    if len(positions) == 0 or not valid_event.any():
+        return pd.Series(result, index=events.index, name=value)
+
+    # Müşteri bazında frame sırası (positions zaten artan)
+    order = np.argsort(codes, kind="stable")
+    positions, codes, starts, ends = (
+        positions[order],
+        codes[order],
+        starts[order],
+        ends[order],
+    )
+    event_codes, event_times = event_codes[valid_event], event_times[valid_event]
+
+    same_customer = codes[1:] == codes[:-1]
+    if np.all(starts[1:][same_customer] >= starts[:-1][same_customer]):
+        # Her müşterinin sözleşmeleri başlangıca göre sıralı (final_data gibi):
+        # frame sırasıyla ilk kapsayan = en erken başlayan kapsayan
+        first = _first_by_start(codes, starts, ends, event_codes, event_times)
+    else:
+        first = _first_by_position(codes, starts, ends, event_codes, event_times)
+
+    values = contracts[value].to_numpy()
+    matched = first >= 0
+    matched_values = np.full(len(first), None, dtype=object)
+    matched_values[matched] = values[positions[first[matched]]]
+    result[valid_event] = matched_values
+
+    return pd.Series(result, index=events.index, name=value)
+
+
+def _first_by_start(codes, starts, ends, event_codes, event_times) -> np.ndarray:
+    # Sözleşmeler (müşteri, başlangıç) sıralı; her olay için kapsayan ilk
+    # sözleşmenin indeksi, yoksa -1.
+    # Running max of end within each customer: the first contract whose
+    # running max reaches t is the first one (in order) with end >= t
+    ends_cummax = pd.Series(ends).groupby(codes).cummax().to_numpy()
+
+    (start_ranks, cummax_ranks, event_ranks), n_ranks = _time_ranks(
+        starts, ends_cummax, event_times
+    )
+    start_keys = _composite(codes, start_ranks, n_ranks)
+    cummax_keys = _composite(codes, cummax_ranks, n_ranks)
+    event_keys = _composite(event_codes, event_ranks, n_ranks)
+
+    # Contracts of the customer with start <= t end right before `started`
+    started = np.searchsorted(start_keys, event_keys, side="right")
+    first = np.searchsorted(cummax_keys, event_keys, side="left")
+    return np.where(first < started, first, -1)
+
+
+def _first_by_position(codes, starts, ends, event_codes, event_times) -> np.ndarray:
+    # Genel durum: her müşterinin k. sözleşmesi (frame sırasıyla) henüz
+    # eşleşmemiş olaylar için tek seferde denenir; k en fazla müşteri başına
+    # sözleşme sayısı kadar ilerler
+    n_codes = codes[-1] + 1
+    counts = np.bincount(codes, minlength=n_codes)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    first = np.full(len(event_codes), -1, dtype=np.int64)
+    pending = np.flatnonzero(counts[event_codes] > 0)
+    k = 0
+    while len(pending):
+        candidate = offsets[event_codes[pending]] + k
+        times = event_times[pending]
+        hit = (starts[candidate] <= times) & (ends[candidate] >= times)
+        first[pending[hit]] = candidate[hit]
+        pending = pending[~hit]
+        k += 1
+        pending = pending[counts[event_codes[pending]] > k]
+    return first
+
+
+def count_in_intervals(
+    events: pd.DataFrame,
+    intervals: pd.DataFrame,
+    event_key: str,
+    event_time: str,
+    interval_key: str,
+    lower: pd.Series,
+    upper: pd.Series,
+) -> np.ndarray:
+    # Her aralık için aynı anahtara sahip ve lower <= t <= upper olan olay sayısı
+    event_times = pd.to_datetime(events[event_time], errors="coerce")
+    lower = pd.to_datetime(lower, errors="coerce")
+    upper = pd.to_datetime(upper, errors="coerce")
+
+    codes, uniques = pd.factorize(events[event_key])
+    valid_event = (codes >= 0) & event_times.notna().to_numpy()
+    interval_codes = pd.Index(uniques).get_indexer(intervals[interval_key])
+    valid_interval = (
+        (interval_codes >= 0) & lower.notna().to_numpy() & upper.notna().to_numpy()
+    )
+
+    counts = np.zeros(len(intervals), dtype=np.int64)
+    if not valid_event.any() or not valid_interval.any():
+        return counts
+
+    (event_ranks, lower_ranks, upper_ranks), n_ranks = _time_ranks(
+        _ns(event_times)[valid_event],
+        _ns(lower)[valid_interval],
+        _ns(upper)[valid_interval],
+    )
+    event_keys = np.sort(_composite(codes[valid_event], event_ranks, n_ranks))
+    codes = interval_codes[valid_interval]
+    first = np.searchsorted(
+        event_keys, _composite(codes, lower_ranks, n_ranks), side="left"
+    )
+    last = np.searchsorted(
+        event_keys, _composite(codes, upper_ranks, n_ranks), side="right"
+    )
+    counts[valid_interval] = np.maximum(last - first, 0)
+    return counts
@@ -0,0 +1,156 @@
+import multiprocessing
+import os
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+from binning import BINS_FILE
+from export import DEFAULT_EXPORT_FORMAT
+from partial import partialRun
+from rare_categories import CATEGORY_MAPPINGS_FILE
+from sivap import process_excel_files
+from workspace import mark_run_complete
+
+# Aynı anda çalışabilecek pipeline sayısı; fazlası kuyrukta bekler
+MAX_WORKERS = 2
+
+# Bellekte tutulan en fazla bitmiş iş kaydı; fazlası en eskiden silinir
+MAX_FINISHED_JOBS = 100
+
+_executor = None
+_jobs = {}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: workers must not inherit the event loop threads of the API
+        _executor = ProcessPoolExecutor(
+            max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_jobs() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def run_pipeline_job(
+    uyelik_sozlesmeleri_path: str,
+    musteriler_path: str,
+    iptal_listesi_path: str,
+    aktiviteler_dir: str,
+    giriş_çıkış_dir: str,
+    output_dir: str,
+    cutoff_date: str,
+    export_format: str = DEFAULT_EXPORT_FORMAT,
+) -> str:
+    process_excel_files(
+        uyelik_sozlesmeleri_path,
+        musteriler_path,
+        iptal_listesi_path,
+        aktiviteler_dir,
+        giriş_çıkış_dir,
+        output_dir,
+        cutoff_date,
+        export_format=export_format,
+    )
+    mark_run_complete(output_dir)
+    return output_dir
+
+
+def copy_customer_data(customer_file_path: str, output_dir: str) -> str:
+    # Çalışma kendi içinde tam olsun; sonraki partial'lar da buradan okuyabilir.
+    # Müşteri verisinin bin sınırları ve kategori eşlemeleri de yanında gelir.
+    # İş kuyruğa girmeden kopyalanır: kaynak çalışma bu arada silinebilir
+    run_customer_file = os.path.join(output_dir, os.path.basename(customer_file_path))
+    shutil.copyfile(customer_file_path, run_customer_file)
+    for file_name in (BINS_FILE, CATEGORY_MAPPINGS_FILE):
+        source = os.path.join(os.path.dirname(customer_file_path), file_name)
+        if os.path.exists(source):
+            shutil.copyfile(source, os.path.join(output_dir, file_name))
+    return run_customer_file
+
+
+def run_partial_job(
+    test_db_path: str,
+    output_dir: str,
+    cutoff_date: str,
+    customer_file_path: str,
+    export_format: str = DEFAULT_EXPORT_FORMAT,
+    retrain: bool = False,
+) -> str:
+    # customer_file_path: copy_customer_data'nın output_dir içine kopyaladığı
+    # dosya
+    partialRun(
+        test_db_path,
+        output_dir,
+        cutoff_date,
+        customer_file_path,
+        export_format,
+        retrain,
+    )
+    mark_run_complete(output_dir)
+    return output_dir
+
+
+def _evict_jobs(max_finished: int = MAX_FINISHED_JOBS) -> None:
+    # _jobs eklenme sırasında; kuyruktaki ve çalışan işler silinmez
+    finished = [job_id for job_id, job in _jobs.items() if job["future"].done()]
+    for job_id in finished[: max(len(finished) - max_finished, 0)]:
+        del _jobs[job_id]
+
+
+def submit_job(fn, *args) -> str:
+    global _executor
+    _evict_jobs()
+    try:
+        future = _get_executor().submit(fn, *args)
+    except BrokenProcessPool:
+        # Bir worker beklenmedik şekilde öldüyse (ör. bellek) havuzu yenile
+        print("Process pool is broken, starting a new one")
+        _executor = None
+        future = _get_executor().submit(fn, *args)
+
+    job_id = uuid.uuid4().hex
+    _jobs[job_id] = {
+        "kind": fn.__name__,
+        "submitted_at": datetime.now().isoformat(timespec="seconds"),
+        "future": future,
+    }
+    return job_id
+
+
+def get_job(job_id: str):
+    return _jobs.get(job_id)
+
+
+def job_status(job_id: str):
+    job = _jobs.get(job_id)
+    if job is None:
+        return None
+
+    future = job["future"]
+    error = None
+    if not future.done():
+        status = "running" if future.running() else "queued"
+    elif future.cancelled():
+        status = "cancelled"
+    elif future.exception() is not None:
+        status = "failed"
+        error = str(future.exception())
+    else:
+        status = "finished"
+
+    return {
+        "job_id": job_id,
+        "kind": job["kind"],
+        "submitted_at": job["submitted_at"],
+        "status": status,
+        "error": error,
+    }
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Her model kendi klasöründe: models/<version>/bundle.json; current.json en
+# son kaydedilen versiyonu gösterir
+MODELS_DIR = "models"
+BUNDLE_FILE = "bundle.json"
+CURRENT_FILE = "current.json"
+
+# Bump when the bundle layout changes so old bundles are not loaded
+REGISTRY_VERSION = "1"
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float, list, dict)):
+        return value
+    # JSON'da karşılığı olmayan değerler (ör. tarih kolonundaki Timestamp)
+    # str yazılır; katsayı isimlerindeki f"{feature}_{değer}" ile aynı biçim
+    return str(value)
+
+
+def _write_json(payload: dict, path: str) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2, default=_json_value)
+    os.replace(tmp_path, path)
+
+
+def model_version(training_data_hash: str, params: dict) -> str:
+    # Aynı eğitim verisi ve parametreler aynı versiyonu verir; eğitim
+    # deterministik olduğu için yeniden eğitmek aynı modeli üretir
+    payload = json.dumps(
+        [REGISTRY_VERSION, training_data_hash, params], default=str, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _bundle_path(version: str, models_dir: str) -> str:
+    return os.path.join(models_dir, version, BUNDLE_FILE)
+
+
+def _set_current(version: str, models_dir: str) -> None:
+    _write_json(
+        {"registry_version": REGISTRY_VERSION, "version": version},
+        os.path.join(models_dir, CURRENT_FILE),
+    )
+
+
+def register_model(
+    log_model,
+    base_profile_df: pd.DataFrame,
+    coefficients_df: pd.DataFrame,
+    training_info: dict,
+    bins: dict,
+    category_mappings: dict,
+    training_data_hash: str,
+    params: dict,
+    models_dir: str = MODELS_DIR,
+) -> str:
+    version = model_version(training_data_hash, params)
+    # Aynı versiyon zaten kayıtlıysa (ör. eğitim checkpoint'ten geldi) bundle
+    # yeniden yazılmaz; created_at ilk kaydın zamanı kalır
+    if os.path.exists(_bundle_path(version, models_dir)):
+        if current_model_version(models_dir) != version:
+            _set_current(version, models_dir)
+        return version
+
+    bundle = {
+        "registry_version": REGISTRY_VERSION,
+        "version": version,
+        "created_at": time.time(),
+        "features": list(training_info["encoder_categories"]),
+        "encoder_categories": training_info["encoder_categories"],
+        "base_profile": [
+            [feature, _json_value(base)]
+            for feature, base in base_profile_df.itertuples(index=False)
+        ],
+        "bins": bins,
+        "category_mappings": category_mappings,
+        "coefficients": [
+            [feature, float(coefficient)]
+            for feature, coefficient in coefficients_df.itertuples(index=False)
+        ],
+        "intercept": float(log_model.intercept_[0]),
+        "metadata": {
+            "training_data_hash": training_data_hash,
+            "params": params,
+            "metrics": training_info["metrics"],
+        },
+    }
+
+    os.makedirs(os.path.join(models_dir, version), exist_ok=True)
+    _write_json(bundle, _bundle_path(version, models_dir))
+    _set_current(version, models_dir)
+    print(f"Model {version} registered")
+    return version
+
+
+def find_model(training_data_hash: str, params: dict, models_dir: str = MODELS_DIR):
+    # Bu veriyle daha önce eğitilmiş model varsa versiyonu, yoksa None
+    version = model_version(training_data_hash, params)
+    if os.path.exists(_bundle_path(version, models_dir)):
+        return version
+    return None
+
+
+def current_model_version(models_dir: str = MODELS_DIR):
+    try:
+        with open(os.path.join(models_dir, CURRENT_FILE)) as f:
+            current = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if current.get("registry_version") != REGISTRY_VERSION:
+        return None
+    return current["version"]
+
+
+def load_model(version: str | None = None, models_dir: str = MODELS_DIR) -> dict:
+    # version verilmezse current.json'daki model
+    if version is None:
+        version = current_model_version(models_dir)
+        if version is None:
+            raise FileNotFoundError(f"No registered model in {models_dir}")
+
+    with open(_bundle_path(version, models_dir)) as f:
+        bundle = json.load(f)
+    if bundle.get("registry_version") != REGISTRY_VERSION:
+        raise ValueError(f"Model {version} has an unsupported bundle layout")
+    return bundle
+
+
+def model_coefficients(bundle: dict) -> pd.DataFrame:
+    return pd.DataFrame(bundle["coefficients"], columns=["Feature", "Coefficient"])
+
+
+def model_base_profile(bundle: dict) -> pd.DataFrame:
+    return pd.DataFrame(bundle["base_profile"], columns=["Feature", "Base_Category"])
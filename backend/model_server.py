@@ -0,0 +1,132 @@
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+from binning import apply_bins, range_label
+from model_registry import (
+    MODELS_DIR,
+    current_model_version,
+    load_model,
+    model_coefficients,
+)
+from rare_categories import OTHER_LABEL, apply_category_mappings
+from scoring import SCORING_COLUMNS, build_coefficient_index, score_customers
+
+# İstek başına dönen kolonlar
+SCORE_COLUMNS = ["Sözleşme No", "Score", "Probability", "Class_0.5"]
+
+# version -> bellekte tutulan model; process başına tek model
+_resident = {}
+_resident_lock = threading.Lock()
+
+
+def resident_model(models_dir: str = MODELS_DIR) -> dict:
+    # Her çağrıda yalnızca current.json okunur; registry yeni bir model
+    # gösterdiğinde bundle bir kez yüklenir, katsayı indeksi bir kez kurulur
+    version = current_model_version(models_dir)
+    if version is None:
+        raise FileNotFoundError(f"No registered model in {models_dir}")
+
+    model = _resident.get(version)
+    if model is None:
+        with _resident_lock:
+            model = _resident.get(version)
+            if model is None:
+                bundle = load_model(version, models_dir)
+                model = {
+                    "version": version,
+                    "bins": bundle["bins"],
+                    "category_mappings": bundle["category_mappings"],
+                    "collapsed": {
+                        column: set(values)
+                        for column, values in bundle["category_mappings"].items()
+                    },
+                    "coefficient_index": build_coefficient_index(
+                        model_coefficients(bundle)
+                    ),
+                    "intercept": bundle["intercept"],
+                }
+                _resident.clear()
+                _resident[version] = model
+                print(f"Model {version} loaded for scoring")
+    return model
+
+
+def prepare_contracts(contracts: pd.DataFrame, model: dict) -> pd.DataFrame:
+    # Ham sözleşme alanları -> modelin gördüğü kategoriler: nadir kategoriler
+    # "Others", sayısal alanlar eğitimdeki sınırlarla _Range etiketleri.
+    # Ham değeri boş olan satırlarda gönderilen hazır _Range değeri kullanılır
+    contracts = contracts.where(contracts.notna(), np.nan)
+    contracts = apply_category_mappings(contracts, model["category_mappings"])
+    given_ranges = {
+        f"{column}_Range": contracts[f"{column}_Range"]
+        for column in model["bins"]
+        if column in contracts.columns and f"{column}_Range" in contracts.columns
+    }
+    contracts = apply_bins(contracts, model["bins"])
+    for range_column, given in given_ranges.items():
+        raw = contracts[range_column.removesuffix("_Range")]
+        contracts[range_column] = (
+            contracts[range_column].astype(object).where(raw.notna(), given)
+        )
+    for column in ["Sözleşme No"] + SCORING_COLUMNS:
+        if column not in contracts.columns:
+            contracts[column] = np.nan
+    return contracts
+
+
+def score_contracts(contracts: pd.DataFrame, model: dict) -> pd.DataFrame:
+    # sivap.score_pending ile aynı puanlama (bkz. scoring.score_customers)
+    scores = score_customers(
+        prepare_contracts(contracts, model),
+        model["coefficient_index"],
+        model["intercept"],
+    )
+    return scores[SCORE_COLUMNS]
+
+
+def _is_empty(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _record_value(record: dict, feature: str, model: dict):
+    # prepare_contracts'ın tek sözleşme karşılığı; boş değer -> NaN ("nan")
+    column = feature.removesuffix("_Range")
+    if (
+        column != feature
+        and column in model["bins"]
+        and not _is_empty(record.get(column))
+    ):
+        value = range_label(record[column], model["bins"][column])
+    else:
+        value = record.get(feature)
+    if value is None:
+        return np.nan
+    if value in model["collapsed"].get(feature, ()):
+        return OTHER_LABEL
+    return value
+
+
+def score_records(records: list[dict], model: dict) -> list[dict]:
+    # Birkaç sözleşmelik istekler için frame kurmadan puanlama; ağırlıklar
+    # score_customers'taki gibi f"{feature}_{değer}" anahtarıyla bulunur
+    scores = np.full(len(records), model["intercept"], dtype=float)
+    for i, record in enumerate(records):
+        for feature in SCORING_COLUMNS:
+            value = _record_value(record, feature, model)
+            scores[i] += (
+                model["coefficient_index"].get(feature, {}).get(str(value), 0.0)
+            )
+
+    probabilities = 1 / (1 + np.exp(-scores))
+    return [
+        {
+            "Sözleşme No": record.get("Sözleşme No"),
+            "Score": float(score),
+            "Probability": float(probability),
+            "Class_0.5": int(probability >= 0.5),
+        }
+        for record, score, probability in zip(records, scores, probabilities)
+    ]
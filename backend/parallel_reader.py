@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from excel_cache import read_excel_cached
+
+# Aynı anda parse edilen workbook sayısı (bellek için üst sınır)
+MAX_READ_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def read_excel_files(
+    paths: list[str], reader=read_excel_cached, max_workers: int = MAX_READ_WORKERS
+) -> dict[str, pd.DataFrame]:
+    # path -> frame; okunamayan dosyalar yazdırılıp atlanır.
+    # reader modül seviyesinde bir fonksiyon olmalı (process'e pickle edilir)
+    frames = {}
+    if not paths:
+        return frames
+
+    if max_workers <= 1 or len(paths) == 1:
+        for path in paths:
+            try:
+                frames[path] = reader(path)
+            except Exception as e:
+                print(f"Error processing file {path}: {e}")
+        return frames
+
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        futures = {executor.submit(reader, path): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                frames[path] = future.result()
+            except Exception as e:
+                print(f"Error processing file {path}: {e}")
+    return frames
+
+
+def read_excel_dir(
+    directory: str, reader=read_excel_cached, max_workers: int = MAX_READ_WORKERS
+) -> pd.DataFrame:
+    # Klasördeki tüm workbook'lar paralel okunur, tek concat ile birleşir
+    paths = [
+        os.path.join(directory, file_name)
+        for file_name in sorted(os.listdir(directory))
+        if file_name.endswith((".xlsx", ".xls"))
+    ]
+    frames = read_excel_files(paths, reader, max_workers)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(
+        [frames[path] for path in paths if path in frames], ignore_index=True
+    )
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+from dtypes import memory_mb
+from excel_cache import manifest_digest
+from excel_reader import engine_name
+
+STAGES_DIR = "cache/stages"
+
+# Bump when a stage's code changes its output so old checkpoints are ignored
+PIPELINE_VERSION = "7"
+
+# Aşama başına saklanan checkpoint sayısı; en eski kullanılanlar silinir
+MAX_CHECKPOINTS_PER_STAGE = 3
+
+
+def dir_digest(directory: str, manifest: dict | None = None) -> str:
+    # Klasördeki workbook'ların adları ve içerikleri. manifest: store'un
+    # dosya adı -> {mtime, size, sha256} kaydı; değişmeyen dosyalar yeniden
+    # hash'lenmez
+    manifest = manifest or {}
+    digest = hashlib.sha256()
+    for file_name in sorted(os.listdir(directory)):
+        if file_name.endswith((".xlsx", ".xls")):
+            file_path = os.path.join(directory, file_name)
+            digest.update(file_name.encode())
+            digest.update(
+                manifest_digest(
+                    file_path, os.stat(file_path), manifest.get(file_name)
+                ).encode()
+            )
+    return digest.hexdigest()
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    digest = hashlib.sha256()
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def stage_key(name: str, *parts) -> str:
+    # parts: girdi dosyalarının digest'leri, önceki aşamaların anahtarları ve
+    # parametreler; biri değişince bu aşama ve sonrakiler yeniden çalışır
+    payload = json.dumps(
+        [PIPELINE_VERSION, engine_name(), name, *parts], default=str, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _checkpoint_path(name: str, key: str, stages_dir: str) -> str:
+    return os.path.join(stages_dir, name, f"{key}.pkl")
+
+
+def _write_checkpoint(result, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _evict_checkpoints(stage_dir: str, keep: int) -> None:
+    checkpoints = sorted(
+        (
+            os.path.join(stage_dir, file_name)
+            for file_name in os.listdir(stage_dir)
+            if file_name.endswith(".pkl")
+        ),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    for path in checkpoints[keep:]:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Could not remove checkpoint {path}: {e}")
+
+
+def run_stage(name: str, key: str, fn, *args, stages_dir: str = STAGES_DIR):
+    # Aynı anahtarla daha önce tamamlanmış aşama diskten okunur; yarıda kalan
+    # bir run tekrar başlatıldığında son başarılı aşamadan devam eder
+    path = _checkpoint_path(name, key, stages_dir)
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+            os.utime(path)
+            size_mb = memory_mb(result)
+            print(f"Stage {name}: using checkpoint {key[:12]} ({size_mb:.1f} MB)")
+            return result
+        except Exception as e:
+            print(f"Checkpoint for stage {name} could not be read, re-running: {e}")
+
+    print(f"Stage {name}: running")
+    result = fn(*args)
+    print(f"Stage {name}: done ({memory_mb(result):.1f} MB)")
+    try:
+        _write_checkpoint(result, path)
+        _evict_checkpoints(os.path.dirname(path), MAX_CHECKPOINTS_PER_STAGE)
+    except Exception as e:
+        print(f"Could not checkpoint stage {name}: {e}")
+    return result
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+# Bu üyeliklerde süre iş günü olarak sayılır (bitiş günü dahil)
+FIVE_DAY_MEMBERSHIPS = ["FIVE DAYS BİREYSEL", "FIVE DAYS AİLE"]
+
+
+def unit_prices(
+    df: pd.DataFrame,
+    price_col: str = "Adjusted Tutar",
+    start_col: str = "Başlangıç T.",
+    end_col: str = "Ek Süreli Bitiş T.",
+    membership_col: str = "Üyelik Adı",
+) -> pd.Series:
+    # Günlük ücret = ücret / süre. Tarih eksikse, ücret 0 ise ya da süre
+    # pozitif değilse NaN
+    start = pd.to_datetime(df[start_col], errors="coerce", format="mixed")
+    end = pd.to_datetime(df[end_col], errors="coerce", format="mixed")
+    price = df[price_col].to_numpy(dtype=float)
+
+    valid = (start.notna() & end.notna()).to_numpy() & (price != 0)
+    five_days = df[membership_col].isin(FIVE_DAY_MEMBERSHIPS).to_numpy()
+
+    duration = np.zeros(len(df), dtype=np.int64)
+    calendar = valid & ~five_days
+    duration[calendar] = (end - start).dt.days.to_numpy()[calendar]
+
+    business = valid & five_days
+    if business.any():
+        begin_days = start.to_numpy()[business].astype("datetime64[D]")
+        end_days = end.to_numpy()[business].astype("datetime64[D]")
+        duration[business] = np.busday_count(begin_days, end_days + 1)
+
+    valid &= duration > 0
+    prices = np.full(len(df), np.nan)
+    prices[valid] = price[valid] / duration[valid]
+    return pd.Series(prices, index=df.index, name="Unit Price (TL per day)")
+
+
+def pure_contract_codes(codes: pd.Series) -> pd.Series:
+    # "12345-2" -> "12345": aile üyeleri asil sözleşmenin numarasını paylaşır
+    return codes.str.split("-", n=1).str[0]
+
+
+def distribute_family_prices(
+    unit_price: pd.Series,
+    pure_codes: pd.Series,
+    member_types: pd.Series,
+    owner_type: str = "Asil Üyelik",
+) -> pd.Series:
+    # Asil üyesi olan her ailede asilin (ilk asil satırının) günlük ücreti
+    # aile üye sayısına bölünüp tüm üyelere yazılır; asilsiz gruplar aynen kalır
+    # groupby.first() boş değerleri atlar; asilin ücreti boşsa boş kalmalı
+    owners = member_types == owner_type
+    owner_codes = pure_codes[owners]
+    first_owner = ~owner_codes.duplicated()
+    owner_price = pd.Series(
+        unit_price[owners][first_owner].to_numpy(), index=owner_codes[first_owner]
+    )
+    has_owner = pure_codes.isin(owner_price.index)
+    family_size = pure_codes.groupby(pure_codes, sort=False).transform("size")
+    distributed = pure_codes.map(owner_price) / family_size
+    return unit_price.where(~has_owner, distributed)
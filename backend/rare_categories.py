@@ -0,0 +1,105 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+OTHER_LABEL = "Others"
+
+# Ki-kare varsayımı: beklenen frekansı bu değerin altına düşen kategoriler
+# tek başına güvenilir değil, "Others" altında toplanır
+MIN_EXPECTED_FREQUENCY = 5
+
+# Çalışma klasöründe saklanan eşleme dosyası
+CATEGORY_MAPPINGS_FILE = "category_mappings.json"
+
+# Bump when the stored mapping layout changes
+MAPPINGS_VERSION = "1"
+
+
+def fit_category_mappings(
+    df: pd.DataFrame,
+    columns: list[str],
+    target_col: str = "Yenileme Durumu",
+    min_expected: float = MIN_EXPECTED_FREQUENCY,
+) -> dict[str, list]:
+    # Kolon -> "Others" yapılacak değerler. Tüm kolonlar tek bir uzun tabloda
+    # sayılır: her (kolon, değer) satırı için gözlenen hedef dağılımı, beklenen
+    # frekanslar da satır toplamı x kolon toplamı / genel toplam dış çarpımı
+    labelled = df.loc[df[target_col].notna(), list(columns) + [target_col]]
+    long = labelled.melt(
+        id_vars=target_col, var_name="column", value_name="value"
+    ).dropna(subset=["value"])
+    if long.empty:
+        return {}
+
+    observed = (
+        long.groupby(["column", "value", target_col], sort=False)
+        .size()
+        .unstack(target_col, fill_value=0)
+    )
+    row_totals = observed.sum(axis=1).to_numpy()
+    column_totals = observed.groupby(level="column", sort=False).sum()
+    row_columns = observed.index.get_level_values("column")
+    class_totals = column_totals.loc[row_columns].to_numpy()
+    grand_totals = class_totals.sum(axis=1)
+
+    expected = row_totals[:, None] * class_totals / grand_totals[:, None]
+
+    # Kolonda hiç görülmeyen hedef sınıfı o kolonun tablosunda yoktur
+    low = ((expected < min_expected) & (class_totals > 0)).any(axis=1)
+
+    mappings = {}
+    for column, value in observed.index[low]:
+        mappings.setdefault(column, []).append(value)
+    return mappings
+
+
+def apply_category_mappings(
+    df: pd.DataFrame, mappings: dict[str, list], other_label: str = OTHER_LABEL
+) -> pd.DataFrame:
+    df = df.copy()
+    for column, values in mappings.items():
+        if column not in df.columns:
+            continue
+        collapsed = df[column].isin(values)
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            # category kolona yeni değer yazılamaz: "Others" önce kategorilere
+            # eklenir (sıralı kalır), daraltılan değerler kategorilerden çıkar
+            column_values = df[column].cat.set_categories(
+                df[column].cat.categories.union([other_label])
+            )
+            df[column] = column_values.where(
+                ~collapsed, other_label
+            ).cat.remove_unused_categories()
+        else:
+            df[column] = df[column].where(~collapsed, other_label)
+    return df
+
+
+def _json_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def save_category_mappings(mappings: dict[str, list], path: str) -> str:
+    payload = {
+        "version": MAPPINGS_VERSION,
+        "other_label": OTHER_LABEL,
+        "columns": {
+            column: [_json_value(value) for value in values]
+            for column, values in mappings.items()
+        },
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_category_mappings(path: str) -> dict[str, list]:
+    with open(path) as f:
+        payload = json.load(f)
+    if payload.get("version") != MAPPINGS_VERSION:
+        raise ValueError(f"Unsupported category mappings version in {path}")
+    return payload["columns"]
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+
+def label_renewals(
+    df: pd.DataFrame,
+    customer_col: str = "Müşteri Kodu",
+    status_col: str = "Sözleşme Durumu",
+    type_col: str = "Söz. Türü",
+) -> pd.Series:
+    # df müşteri ve başlangıç tarihine göre sıralı olmalı; her sözleşme
+    # aynı müşterinin bir sonraki sözleşmesine bakarak etiketlenir:
+    #   Kapandı + sonraki Yenileme/Güncelleme -> 1
+    #   sonraki Başlamadı                      -> 1
+    #   başka sonraki sözleşme                 -> 0
+    #   son sözleşme: Aktif -> None, değilse 0
+    customers = df[customer_col]
+    status = df[status_col]
+
+    next_customer = customers.shift(-1)
+    has_next = (customers == next_customer).to_numpy()
+
+    next_type = df[type_col].shift(-1)
+    next_status = status.shift(-1)
+    renewed_after_close = (status == "Kapandı") & next_type.isin(
+        ["Yenileme", "Güncelleme"]
+    )
+    renewed = renewed_after_close | (next_status == "Başlamadı")
+
+    labels = np.where(
+        has_next,
+        renewed.to_numpy().astype(float),
+        np.where((status == "Aktif").to_numpy(), np.nan, 0.0),
+    )
+    return pd.Series(labels, index=df.index, name="Yenileme Durumu")
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+# Skorlamada kullanılan kategorik kolonlar
+SCORING_COLUMNS = [
+    "Müşteri Kodu",
+    "Üyelik Adı",
+    "Cinsiyet",
+    "Medeni Durumu",
+    "Söz. Türü",
+    "Overall Usage Percentage (%)_Range",
+    "Last 30 Days Utilization (%)_Range",
+    "Average_Visit_Duration_Range",
+    "Aranma Sayısı_Range",
+    "Unit Price (TL per day)_Range",
+    "Renewal Percentage_Range",
+    "Sözleşme Yaşı_Range",
+]
+
+
+def build_coefficient_index(
+    coefficients_df: pd.DataFrame, features: list[str] = SCORING_COLUMNS
+) -> dict[str, dict[str, float]]:
+    # "feature_kategori" isimli katsayı tablosunu feature -> kategori -> ağırlık
+    # sözlüğüne çevirir. Aynı isim birden fazla varsa ilki geçerli.
+    names = coefficients_df["Feature"].astype(str)
+    weights = coefficients_df["Coefficient"].to_numpy()
+
+    index = {}
+    for feature in features:
+        prefix = f"{feature}_"
+        matches = np.flatnonzero(names.str.startswith(prefix).to_numpy())
+        categories = {}
+        for i in matches:
+            categories.setdefault(names.iat[i][len(prefix) :], weights[i])
+        index[feature] = categories
+    return index
+
+
+def score_customers(
+    customers: pd.DataFrame,
+    coefficient_index: dict[str, dict[str, float]],
+    intercept: float,
+    features: list[str] = SCORING_COLUMNS,
+) -> pd.DataFrame:
+    scores = customers[["Sözleşme No"] + features].copy()
+
+    # Score = intercept + her feature için kategorinin katsayısı (yoksa 0)
+    score = np.full(len(scores), intercept, dtype=float)
+    for feature in features:
+        categories = coefficient_index.get(feature, {})
+        values = scores[feature].to_numpy(dtype=object)
+
+        # Ağırlık her farklı değer için bir kez aranır; anahtar eskisi gibi
+        # f"{feature}_{değer}" (NaN -> "nan")
+        codes, uniques = pd.factorize(values)
+        unique_weights = np.array(
+            [categories.get(str(v), 0.0) for v in uniques], dtype=float
+        )
+        weights = np.zeros(len(values))
+        known = codes >= 0
+        weights[known] = unique_weights[codes[known]]
+        weights[~known] = [categories.get(str(v), 0.0) for v in values[~known]]
+        score += weights
+
+    scores["Score"] = score
+    scores["Probability"] = 1 / (1 + np.exp(-scores["Score"]))
+    scores["Class_0.5"] = (scores["Probability"] >= 0.5).astype(int)
+    return scores
@@ -13,32 +13,48 @@ from sklearn.metrics import accuracy_score, confusion_matrix, classification_rep
 from pandas.tseries.offsets import BDay
 from datetime import timedelta
 from IPython.display import display
-import requests
-import io
-
-
-def process_excel_files(
-    uyelik_sozlesmeleri_path: str,
-    musteriler_path: str,
-    iptal_listesi_path: str,
-    aktiviteler_dir: str,
-    giriş_çıkış_dir: str,
-    output_dir: str,
-    cutoff_date: str,
-):
-    FIXED_DIR = "fixedFiles"
-
+from excel_cache import file_digest, read_excel_cached
+from cpi import adjust_amounts, load_cpi_lookup
+from visit_store import giris_cikis_digest, load_giris_cikis
+from visit_cleaning import fix_placeholder_exits
+from call_store import load_call_counts, reports_digest
+from interval_join import assign_intervals
+from usage_features import compute_usage_features
+from renewal import label_renewals
+from scoring import build_coefficient_index, score_customers
+from dtypes import compact_frame, str_categorical
+from rare_categories import (
+    CATEGORY_MAPPINGS_FILE,
+    apply_category_mappings,
+    fit_category_mappings,
+    save_category_mappings,
+)
+from binning import BINS_FILE, apply_bins, fit_bins, save_bins
+from model_registry import register_model
+from pricing import distribute_family_prices, pure_contract_codes, unit_prices
+from pipeline import frame_digest, run_stage, stage_key
+from export import DEFAULT_EXPORT_FORMAT, export_artifacts
+
+# Bin sayısı ve zamana dayalı eğitim oranı (değişirse ilgili aşamalar yeniden çalışır)
+NUM_RANGES = 7
+TRAIN_RATIO = 0.80
+
+
+def merge_contracts(uyelik_sozlesmeleri_path: str, musteriler_path: str):
     # merge söz ve müş
     uyelik_sozlesmeleri_path = uyelik_sozlesmeleri_path
     musteriler_path = musteriler_path
-    uyelik_sozlesmeleri = pd.read_excel(uyelik_sozlesmeleri_path)
-    musteriler = pd.read_excel(musteriler_path)
+    uyelik_sozlesmeleri = read_excel_cached(uyelik_sozlesmeleri_path)
+    musteriler = read_excel_cached(musteriler_path)
     uyelik_sozlesmeleri.rename(columns={"Müş. Kodu": "Müşteri Kodu"}, inplace=True)
     musteriler.rename(columns={"Müş. Kodu": "Müşteri Kodu"}, inplace=True)
     merged_data = pd.merge(
         uyelik_sozlesmeleri, musteriler, on="Müşteri Kodu", how="left"
     )
+    return merged_data
+
 
+def clean_contracts(merged_data: pd.DataFrame, iptal_listesi_path: str):
     # "PERSONEL" sil
     cleaned_data = merged_data[merged_data["Üyelik Adı"] != "PERSONEL"]
 
@@ -63,9 +79,11 @@ def process_excel_files(
 
     # Sözleşme Yaşı bulma
     cleaned_data.loc[:, "Sözleşme Yaşı"] = cleaned_data.apply(
-        lambda row: (row["Satış Tarihi"] - row["Doğum Tarihi_x"]).days // 365
-        if pd.notnull(row["Satış Tarihi"]) and pd.notnull(row["Doğum Tarihi_x"])
-        else None,
+        lambda row: (
+            (row["Satış Tarihi"] - row["Doğum Tarihi_x"]).days // 365
+            if pd.notnull(row["Satış Tarihi"]) and pd.notnull(row["Doğum Tarihi_x"])
+            else None
+        ),
         axis=1,
     )
 
@@ -115,7 +133,7 @@ def process_excel_files(
 
     # İptal listesini yükleme
     file2 = iptal_listesi_path
-    data2 = pd.read_excel(file2)
+    data2 = read_excel_cached(file2)
     data2.rename(columns={"Sözleşme No.": "Sözleşme No"}, inplace=True)
     merged_data = pd.merge(
         cleaned_data,
@@ -135,42 +153,15 @@ def process_excel_files(
     final_data.loc[:, "Ek Süreli Bitiş T."] = pd.to_datetime(
         final_data["Ek Süreli Bitiş T."], errors="coerce"
     )
+    return final_data
 
-    # Yenilendi mi?
-    def check_renewal(df):
-        renewal_status = []
-        for i in range(len(df)):
-            current_customer = df.loc[i, "Müşteri Kodu"]
-            current_status = df.loc[i, "Sözleşme Durumu"]
-            current_type = df.loc[i, "Söz. Türü"]
-
-            if i < len(df) - 1 and df.loc[i + 1, "Müşteri Kodu"] == current_customer:
-                next_type = df.loc[i + 1, "Söz. Türü"]
-                next_status = df.loc[i + 1, "Sözleşme Durumu"]
-                if current_status == "Kapandı" and (
-                    next_type == "Yenileme" or next_type == "Güncelleme"
-                ):
-                    renewal_status.append(1)
-                elif next_status == "Başlamadı":
-                    renewal_status.append(1)
-                else:
-                    renewal_status.append(0)
-            else:
-                if current_status == "Aktif":
-                    renewal_status.append(None)
-                else:
-                    renewal_status.append(0)
-
-        while len(renewal_status) < len(df):
-            renewal_status.append(None)
-
-        df["Yenileme Durumu"] = renewal_status
-        return df
 
+def label_contracts(final_data: pd.DataFrame):
+    # Yenilendi mi?
     final_data = final_data.sort_values(
         by=["Müşteri Kodu", "Başlangıç T."]
     ).reset_index(drop=True)
-    final_data = check_renewal(final_data)
+    final_data["Yenileme Durumu"] = label_renewals(final_data)
 
     # Update "Sözleşme Yaşı" for rows with "Üyelik Tipi" == "Bireysel Üyelik" and "Sözleşme Yaşı" < 18
     mean_age = final_data["Sözleşme Yaşı"].mean()
@@ -179,60 +170,14 @@ def process_excel_files(
         & (final_data["Sözleşme Yaşı"] < 18),
         "Sözleşme Yaşı",
     ] = int(mean_age)
+    # Sonraki aşamalar bu frame'i taşır; tekrar eden str kolonlar category
+    # olur, sayısal kolonlar CPI / fiyat hesabı için olduğu gibi kalır
+    return compact_frame(final_data, downcast_numeric=False)
 
-    # Giriş-Çıkış okuma ve hesaplama
-    excel_folder = giriş_çıkış_dir
-    excel_files = [
-        os.path.join(excel_folder, file)
-        for file in os.listdir(excel_folder)
-        if file.endswith((".xls", ".xlsx"))
-    ]
-    combined_data = pd.DataFrame()
-    for file in excel_files:
-        try:
-            df = pd.read_excel(file)
-            columns_to_drop = [
-                "Aktif",
-                "Üyelik Durumu",
-                "Söz. Durumu",
-                "Üyelik Sözleşmesi Detay Durumu",
-                "Mekan",
-                "Geç Çıkış Süresi(Dk.)",
-                "Giris Cihazı",
-                "Çıkış Cihazı",
-                "İptal Tarihi",
-            ]
-            df = df.drop(
-                columns=[col for col in columns_to_drop if col in df.columns],
-                errors="ignore",
-            )
-            df["Giriş Zamanı"] = pd.to_datetime(
-                df["Giriş Saati"], format="%H:%M", errors="coerce"
-            ).dt.time
-            df["Çıkış Zamanı"] = pd.to_datetime(
-                df["Çıkış Saati"], format="%H:%M", errors="coerce"
-            ).dt.time
-
-            def calculate_duration(row):
-                if pd.notnull(row["Giriş Zamanı"]) and pd.notnull(row["Çıkış Zamanı"]):
-                    entrance = datetime.combine(datetime.min, row["Giriş Zamanı"])
-                    exit = datetime.combine(datetime.min, row["Çıkış Zamanı"])
-                    return (exit - entrance).seconds / 60
-                return None
-
-            df["Kalış Süresi"] = df.apply(calculate_duration, axis=1)
-
-            df = df[df["Kalış Süresi"] >= 15]
-            df = df.drop(
-                columns=["Giriş Saati", "Çıkış Saati", "Giriş Zamanı", "Çıkış Zamanı"],
-                errors="ignore",
-            )
-            combined_data = pd.concat([combined_data, df], ignore_index=True)
-
-            print(f"Processed file: {file}")
-
-        except Exception as e:
-            print(f"Error processing file {file}: {e}")
+
+def assign_visits(final_data: pd.DataFrame, giriş_çıkış_dir: str):
+    # Giriş-Çıkış okuma ve hesaplama (yalnızca yeni / değişen aylar işlenir)
+    combined_data = load_giris_cikis(giriş_çıkış_dir)
 
     omer_file = combined_data
 
@@ -259,37 +204,8 @@ def process_excel_files(
         goksun_data["Çıkış Tarihi"], format="%Y-%m-%d %H:%M:%S.%f", errors="coerce"
     )
 
-    # (23:59:59) girişlerini düzeltme
-    incorrect_exit_time = (
-        goksun_data["Çıkış Tarihi"].dt.time == pd.Timestamp("23:59:59").time()
-    )
-    goksun_data.loc[:, "Duration (minutes)"] = (
-        goksun_data["Çıkış Tarihi"] - omer_file["Giriş Tarihi"]
-    ).dt.total_seconds() / 60
-    valid_data = goksun_data[~incorrect_exit_time]
-    mean_durations = valid_data.groupby("Kodu")["Duration (minutes)"].mean()
-    goksun_data.loc[:, "Member Mean Duration (minutes)"] = goksun_data["Kodu"].map(
-        mean_durations
-    )
-    goksun_data.loc[incorrect_exit_time, "Duration (minutes)"] = goksun_data.loc[
-        incorrect_exit_time, "Kodu"
-    ].map(mean_durations)
-
-    incorrect_exit_time = (
-        goksun_data["Çıkış Tarihi"].dt.time == pd.Timestamp("23:59:59").time()
-    )
-
-    # Ortalama kalma süresi hesaplama
-    overall_mean_duration = goksun_data["Member Mean Duration (minutes)"].mean()
-
-    for index, row in goksun_data[incorrect_exit_time].iterrows():
-        member_mean = row["Member Mean Duration (minutes)"]
-        duration_to_add = (
-            member_mean if pd.notna(member_mean) else overall_mean_duration
-        )
-        goksun_data.at[index, "Çıkış Tarihi"] = row["Giriş Tarihi"] + pd.to_timedelta(
-            duration_to_add, unit="m"
-        )
+    # (23:59:59) çıkışlarını düzeltme
+    goksun_data = fix_placeholder_exits(goksun_data)
 
     final_data.loc[:, "Başlangıç T."] = pd.to_datetime(
         final_data["Başlangıç T."], errors="coerce"
@@ -301,95 +217,43 @@ def process_excel_files(
         goksun_data["Giriş Tarihi"], errors="coerce"
     )
 
-    goksun_data["Sözleşme No"] = None
-
-    for i, row in goksun_data.iterrows():
-        giris_tarihi = row["Giriş Tarihi"]
-        musteri_kodu = row["Kodu"]
-        matched_contract = final_data[
-            (final_data["Müşteri Kodu"] == musteri_kodu)
-            & (final_data["Başlangıç T."] <= giris_tarihi)
-            & (final_data["Ek Süreli Bitiş T."] >= giris_tarihi)
-        ]
-        if not matched_contract.empty:
-            goksun_data.at[i, "Sözleşme No"] = matched_contract.iloc[0]["Sözleşme No"]
+    goksun_data["Sözleşme No"] = assign_intervals(
+        goksun_data, final_data, event_key="Kodu", event_time="Giriş Tarihi"
+    )
 
     # NaN Sözleşme No'ları silme
-    sine_data = goksun_data.dropna(subset=["Sözleşme No"])
+    sine_data = compact_frame(goksun_data.dropna(subset=["Sözleşme No"]))
+    return sine_data
 
-    # Son Feature'ları depolama
-    results = []
-    for _, contract in final_data.iterrows():
-        member_id = contract["Müşteri Kodu"]
-        start_date = contract["Başlangıç T."]
-        end_date = contract["Ek Süreli Bitiş T."]
-        membership_type = contract["Üyelik Adı"]
-        tutar = contract["Tutar ( TL )"]
-        sozlesme_no = contract["Sözleşme No"]
-        sozlesme_turu = contract["Söz. Türü"]
-        sozlesme_durumu = contract["Sözleşme Durumu"]
-        soz_de_du = contract["Sözleşme Detay Durumu"]
-        cinsiyet = contract["Cinsiyet"]
-        med = contract["Medeni Durumu"]
-        uyelik_tipi = contract["Üyelik Tipi"]
-        aday_turu = contract["Aday Türü_x"]
-        sozlesme_yasi = contract["Sözleşme Yaşı"]
-        yenilenme_durumu = contract["Yenileme Durumu"]
-        contract_usage = sine_data[
-            (sine_data["Kodu"] == member_id)
-            & (sine_data["Giriş Tarihi"] >= start_date)
-            & (sine_data["Giriş Tarihi"] <= end_date)
-        ]
-
-        # Total Usage Count
-        total_usage = contract_usage.shape[0]
 
-        # 30 days starting from 60 days before the contract ends
-        last_30_days_start = end_date - timedelta(days=30)
-        last_30_days_usage = contract_usage[
-            (contract_usage["Giriş Tarihi"] >= last_30_days_start)
-            & (contract_usage["Giriş Tarihi"] <= end_date)
-        ]
-        last_30_days_count = last_30_days_usage.shape[0]
-
-        # Five Days
-        if membership_type in ["FIVE DAYS AİLE", "FIVE DAYS BİREYSEL"]:
-            total_possible_days = pd.date_range(
-                start=start_date, end=end_date, freq="D"
-            )
-            max_usage_days = sum(day.weekday() < 5 for day in total_possible_days)
-        else:
-            max_usage_days = (end_date - start_date).days
-        overall_percentage = (
-            (total_usage / max_usage_days) * 100 if max_usage_days > 0 else 0
-        )
-        last_30_days_percentage = (last_30_days_count / 30) * 100
-
-        results.append(
-            {
-                "Müşteri Kodu": member_id,
-                "Üyelik Adı": membership_type,
-                "Başlangıç T.": start_date,
-                "Ek Süreli Bitiş T.": end_date,
-                "Sözleşme No": sozlesme_no,
-                "Sözleşme Durumu": sozlesme_durumu,
-                "Sözleşme Detay Durumu": soz_de_du,
-                "Cinsiyet": cinsiyet,
-                "Medeni Durumu": med,
-                "Söz. Türü": sozlesme_turu,
-                "Üyelik Tipi": uyelik_tipi,
-                "Aday Türü_x": aday_turu,
-                "Sözleşme Yaşı": sozlesme_yasi,
-                "Yenileme Durumu": yenilenme_durumu,
-                "Total Usage": total_usage,
-                "Last 30 Days Usage Count": last_30_days_count,
-                "Overall Usage Percentage (%)": overall_percentage,
-                "Last 30 Days Utilization (%)": last_30_days_percentage,
-                "Tutar ( TL )": tutar,
-            }
-        )
-
-    results_df = pd.DataFrame(results)
+def build_usage_features(final_data: pd.DataFrame, sine_data: pd.DataFrame):
+    # Son Feature'ları depolama
+    usage_features = compute_usage_features(final_data, sine_data)
+    results_df = pd.concat(
+        [
+            final_data[
+                [
+                    "Müşteri Kodu",
+                    "Üyelik Adı",
+                    "Başlangıç T.",
+                    "Ek Süreli Bitiş T.",
+                    "Sözleşme No",
+                    "Sözleşme Durumu",
+                    "Sözleşme Detay Durumu",
+                    "Cinsiyet",
+                    "Medeni Durumu",
+                    "Söz. Türü",
+                    "Üyelik Tipi",
+                    "Aday Türü_x",
+                    "Sözleşme Yaşı",
+                    "Yenileme Durumu",
+                ]
+            ],
+            usage_features,
+            final_data[["Tutar ( TL )"]],
+        ],
+        axis=1,
+    ).reset_index(drop=True)
 
     sine_data = sine_data.copy()
     sine_data["Giriş Tarihi"] = pd.to_datetime(sine_data["Giriş Tarihi"])
@@ -421,7 +285,7 @@ def process_excel_files(
 
     sine_data["Assigned Interval"] = sine_data["Midpoint"].apply(map_to_interval)
     result = (
-        sine_data.groupby("Sözleşme No")
+        sine_data.groupby("Sözleşme No", observed=True)
         .agg(
             Üyelik=("Üyelik", "first"),
             Average_Entry_Hour=("Giriş Saat", "mean"),
@@ -458,85 +322,27 @@ def process_excel_files(
     results_df.loc[
         results_df["Total Usage"] == 0, ["Average_Visit_Duration", "Assigned Interval"]
     ] = 0
+    return results_df
 
+
+def add_call_counts(
+    results_df: pd.DataFrame, final_data: pd.DataFrame, aktiviteler_dir: str
+):
     # Aktivite Raporlarından Aranma Sayısı bulma
-    folder_path = aktiviteler_dir
-    all_data = []
-
-    for file_name in os.listdir(folder_path):
-        if file_name.endswith(".xlsx") or file_name.endswith(".xls"):
-            file_path = os.path.join(folder_path, file_name)
-            try:
-                df = pd.read_excel(file_path)
-                df["Dosya Adı"] = file_name
-                all_data.append(df)
-            except Exception as e:
-                print(f"{file_name} okunurken bir hata oluştu: {e}")
-
-    aranma_data = pd.concat(all_data, ignore_index=True)
-
-    # Datetime doğrulama
-    aranma_data["Tarih"] = pd.to_datetime(aranma_data["Tarih"])
+    final_data = final_data.copy()
     final_data["Başlangıç T."] = pd.to_datetime(final_data["Başlangıç T."])
     final_data["Ek Süreli Bitiş T."] = pd.to_datetime(final_data["Ek Süreli Bitiş T."])
-    aranma_data["Sözleşme No"] = None
-    for i, call in aranma_data.iterrows():
-        müş_kodu = call["Kodu"]
-        call_date = call["Tarih"]
-        matching_contracts = final_data[
-            (final_data["Müşteri Kodu"] == müş_kodu)
-            & (final_data["Başlangıç T."] <= call_date)
-            & (final_data["Ek Süreli Bitiş T."] >= call_date)
-        ]
-        if not matching_contracts.empty:
-            aranma_data.at[i, "Sözleşme No"] = matching_contracts.iloc[0]["Sözleşme No"]
-
-    sözleşme_counts = aranma_data["Sözleşme No"].value_counts()
-    aranma_data["Aranma Sayısı"] = aranma_data["Sözleşme No"].map(sözleşme_counts)
+    call_counts = load_call_counts(aktiviteler_dir, final_data)
 
     # Sözleşme No'ya göre Aranma Sayısı eşleştirme
-    final_data = final_data.merge(
-        aranma_data[["Sözleşme No", "Aranma Sayısı"]], on="Sözleşme No", how="left"
-    )
-    final_data = final_data.drop_duplicates()
-    final_data = final_data.drop_duplicates(subset=["Sözleşme No"])
-    results_df = results_df.merge(
-        final_data[["Sözleşme No", "Aranma Sayısı"]], on="Sözleşme No", how="left"
-    )
+    results_df["Aranma Sayısı"] = results_df["Sözleşme No"].map(call_counts)
     results_df = results_df.dropna(subset=["Assigned Interval"])
     results_df["Aranma Sayısı"] = results_df["Aranma Sayısı"].fillna(0)
+    return results_df
 
-    contracts_df = results_df.copy()
 
-    # Download TÜİK CPI Table
-    url = "https://data.tuik.gov.tr/Bulten/DownloadIstatistikselTablo?p=VbZnKRKuqHltfgm6LftGQSYqYlk/uPE2vMOyUf0LUPBBo1cKgBWHc1stJWf1n5Mv"
-    response = requests.get(url)
-    xls = pd.read_excel(
-        io.BytesIO(response.content), sheet_name=0, skiprows=4, nrows=21
-    )
-
-    # Clean CPI table
-    xls.columns = xls.columns.map(str).str.strip()
-    xls = xls.dropna(how="all", axis=1).dropna(how="all", axis=0)
-    xls.rename(columns={xls.columns[0]: "Year"}, inplace=True)
-    xls["Year"] = pd.to_numeric(xls["Year"], errors="coerce")
-    cpi_lookup = xls.set_index("Year")
-
-    # Translate month names: English → Turkish
-    month_translation = {
-        "January": "Ocak",
-        "February": "Şubat",
-        "March": "Mart",
-        "April": "Nisan",
-        "May": "Mayıs",
-        "June": "Haziran",
-        "July": "Temmuz",
-        "August": "Ağustos",
-        "September": "Eylül",
-        "October": "Ekim",
-        "November": "Kasım",
-        "December": "Aralık",
-    }
+def adjust_for_cpi(results_df: pd.DataFrame, cpi_lookup: pd.DataFrame):
+    contracts_df = results_df.copy()
 
     # Get latest CPI index from last year
     latest_year = cpi_lookup.index.max()
@@ -546,144 +352,47 @@ def process_excel_files(
 
     print(f"Latest CPI Index: {latest_index:.2f} ({latest_month} {latest_year})")
 
-    # Your contract data
-    # Assuming contracts_df already exists with columns:
-    # - 'Başlangıç T.'
-    # - 'Tutar ( TL )'
-
-    # Define CPI adjustment function per row
-    def apply_cpi_adjustment(row):
-        try:
-            start_date = pd.to_datetime(row["Başlangıç T."], errors="coerce")
-            if pd.isna(start_date) or row["Tutar ( TL )"] == 0:
-                return row["Tutar ( TL )"]
-
-            year = start_date.year
-            month_idx = start_date.month  # 1=January, 2=February, ..., 12=December
-
-            if year not in cpi_lookup.index:
-                return row["Tutar ( TL )"]
-
-            # Get the CPI index for that year and month
-            month_col_name = cpi_lookup.columns[month_idx - 1]  # zero-indexed
-            start_index = cpi_lookup.loc[year, month_col_name]
-
-            # Reference (latest) index
-            latest_index = cpi_lookup.iloc[-1].dropna().values[-1]
-
-            if pd.isna(start_index) or start_index == 0:
-                return row["Tutar ( TL )"]
-
-            adjusted = row["Tutar ( TL )"] * (latest_index / start_index)
-            return adjusted
-        except Exception as e:
-            print(f"Error on row: {e}")
-            return row["Tutar ( TL )"]
-
-    # Apply to all contracts
-    contracts_df["Adjusted Tutar"] = contracts_df.apply(apply_cpi_adjustment, axis=1)
-
-    # Optional: Save
-    contracts_df.to_excel("processed/adjusted_contracts_with_cpi.xlsx", index=False)
-
-    # Five Days için ücret
-    five_day_memberships = ["FIVE DAYS BİREYSEL", "FIVE DAYS AİLE"]
-
-    def calculate_unit_price(row):
-        start_date = pd.to_datetime(row["Başlangıç T."], errors="coerce")
-        end_date = pd.to_datetime(row["Ek Süreli Bitiş T."], errors="coerce")
-        price = row["Adjusted Tutar"]
-        membership_type = row["Üyelik Adı"]
-        if pd.isna(start_date) or pd.isna(end_date) or price == 0:
-            return None
-        if membership_type in five_day_memberships:
-            duration_days = np.busday_count(
-                start_date.date(), end_date.date() + timedelta(days=1)
-            )
-        else:
-            duration_days = (end_date - start_date).days
+    # Tüm sözleşmeler tek seferde, (yıl, ay) endeks dizisinden (bkz. cpi.py)
+    contracts_df["Adjusted Tutar"] = adjust_amounts(
+        contracts_df["Başlangıç T."], contracts_df["Tutar ( TL )"], cpi_lookup
+    )
+    return contracts_df
 
-        if duration_days <= 0:
-            return None
-        unit_price = price / duration_days
-        return unit_price
 
-    contracts_df["Unit Price (TL per day)"] = contracts_df.apply(
-        calculate_unit_price, axis=1
-    )
-    # Kategorik kolonlar, yetersiz veri içerenleri "Others" yapma
-    try:
-        exclude_columns = ["Müşteri Kodu", "Sözleşme No"]
-        categorical_columns = contracts_df.select_dtypes(include="object").columns
-        categorical_columns = categorical_columns.difference(exclude_columns)
-
-        category_mappings = {column: {} for column in categorical_columns}
-        for column in categorical_columns:
-            contingency_table = pd.crosstab(
-                contracts_df[column], contracts_df["Yenileme Durumu"]
-            )
-            row_totals = contingency_table.sum(axis=1)
-            column_totals = contingency_table.sum(axis=0)
-            grand_total = contingency_table.values.sum()
-            expected_frequencies = pd.DataFrame(
-                [
-                    [
-                        (row_totals[row] * column_totals[col]) / grand_total
-                        for col in contingency_table.columns
-                    ]
-                    for row in contingency_table.index
-                ],
-                index=contingency_table.index,
-                columns=contingency_table.columns,
-            )
-            low_frequency_categories = (
-                expected_frequencies[expected_frequencies < 5].dropna(how="all").index
-            )
-            if not low_frequency_categories.empty:
-                category_mappings[column].update(
-                    {category: "Others" for category in low_frequency_categories}
-                )
-
-        for column, mapping in category_mappings.items():
-            if mapping:
-                contracts_df[column] = contracts_df[column].replace(mapping)
-
-        for column in categorical_columns:
-            print(f"Counts for {column}:")
-            print(contracts_df[column].value_counts())
+def prepare_features(contracts_df: pd.DataFrame):
+    contracts_df = contracts_df.copy()
 
+    # Günlük ücret; Five Days üyeliklerinde iş günü üzerinden (bkz. pricing.py)
+    contracts_df["Unit Price (TL per day)"] = unit_prices(contracts_df)
+    # Kategorik kolonlar, yetersiz veri içerenleri "Others" yapma; eşlemeler
+    # çıktılarla birlikte saklanır, yeni veri aynı eşlemelerle daraltılır
+    exclude_columns = ["Müşteri Kodu", "Sözleşme No"]
+    categorical_columns = contracts_df.select_dtypes(
+        include=["object", "category"]
+    ).columns
+    categorical_columns = categorical_columns.difference(exclude_columns)
+    try:
+        category_mappings = fit_category_mappings(
+            contracts_df, list(categorical_columns)
+        )
+        contracts_df = apply_category_mappings(contracts_df, category_mappings)
     except Exception as e:
         print(f"An error occurred: {e}")
+        category_mappings = {}
 
-    # Saf Sözleşme - Asil No bulma
-    def extract_pure_code(code):
-        if isinstance(code, str):
-            return code.split("-")[0]
-        else:
-            return code
+    for column, values in category_mappings.items():
+        print(f"{column}: {len(values)} categories collapsed into Others")
 
     contracts_df["Sözleşme No"] = (
         contracts_df["Sözleşme No"].astype(str).replace("nan", "")
     )
 
-    contracts_df["Pure Sözleşme No"] = contracts_df["Sözleşme No"].apply(
-        extract_pure_code
-    )
-
-    # Aile üyeliklerinde ücret bölme
-    def distribute_tutar(group):
-        asil_member = group[group["Üyelik Tipi"] == "Asil Üyelik"]
-        if not asil_member.empty:
-            total_tutar = asil_member.iloc[0]["Unit Price (TL per day)"]
-            member_count = len(group)
-            distributed_tutar = total_tutar / member_count if member_count > 0 else 0
-            group["Unit Price (TL per day)"] = distributed_tutar
-        return group
-
-    contracts_df = contracts_df.groupby("Pure Sözleşme No", group_keys=False).apply(
-        distribute_tutar
+    # Aile üyeliklerinde asilin ücreti üyelere bölünür
+    contracts_df["Unit Price (TL per day)"] = distribute_family_prices(
+        contracts_df["Unit Price (TL per day)"],
+        pure_contract_codes(contracts_df["Sözleşme No"]),
+        contracts_df["Üyelik Tipi"],
     )
-    contracts_df = contracts_df.drop(columns=["Pure Sözleşme No"])
 
     test_db = contracts_df.copy()
 
@@ -691,70 +400,34 @@ def process_excel_files(
     filtered_db = test_db.dropna(subset=["Yenileme Durumu"])
 
     # Yenileme Oranı Bulma
+    # reindex: Müşteri Kodu category olsa da sonuç float kalır
     renewal_percentage = (
-        filtered_db.groupby("Müşteri Kodu")["Yenileme Durumu"].mean() * 100
-    )
-    test_db["Renewal Percentage"] = test_db["Müşteri Kodu"].map(renewal_percentage)
-    renewal_counts = test_db.groupby("Müşteri Kodu")["Yenileme Durumu"].sum()
-    test_db["Number of Past Renewals"] = test_db["Müşteri Kodu"].map(renewal_counts)
-
-    # Kategorilere Ayırma
-    def assign_range_column(df, column, num_ranges=None, custom_ranges=None):
-        try:
-            if custom_ranges:
-                bins = pd.cut(df[column], bins=custom_ranges, include_lowest=True)
-                range_labels = [
-                    f"[{custom_ranges[i]:.2f}-{custom_ranges[i + 1]:.2f})"
-                    for i in range(len(custom_ranges) - 1)
-                ]
-
-                range_column_name = f"{column}_Range"
-                df[range_column_name] = pd.cut(
-                    df[column],
-                    bins=custom_ranges,
-                    labels=range_labels,
-                    include_lowest=True,
-                )
-            else:
-                bins, bin_edges = pd.qcut(
-                    df[column], q=num_ranges, retbins=True, duplicates="drop"
-                )
-                range_labels = [
-                    f"[{bin_edges[i]:.2f}-{bin_edges[i + 1]:.2f})"
-                    for i in range(len(bin_edges) - 1)
-                ]
-
-                range_column_name = f"{column}_Range"
-                df[range_column_name] = pd.qcut(
-                    df[column], q=num_ranges, labels=range_labels, duplicates="drop"
-                )
-        except Exception as e:
-            print(f"Error processing column '{column}': {e}")
-
-        return df
-
-    columns_to_divide = [
-        "Sözleşme Yaşı",
-        "Aranma Sayısı",
-        "Overall Usage Percentage (%)",
-        "Last 30 Days Utilization (%)",
-        "Average_Visit_Duration",
-        "Unit Price (TL per day)",
-        "Renewal Percentage",
-        "Number of Past Renewals",
-    ]
-    num_ranges = 7
-
-    for column in columns_to_divide:
-        if column == "Last 30 Days Utilization (%)":
-            custom_bins = [0, 1, 30, 100]
-            test_db = assign_range_column(test_db, column, custom_ranges=custom_bins)
-        else:
-            test_db = assign_range_column(test_db, column, num_ranges=num_ranges)
+        filtered_db.groupby("Müşteri Kodu", observed=True)["Yenileme Durumu"].mean()
+        * 100
+    )
+    test_db["Renewal Percentage"] = renewal_percentage.reindex(
+        test_db["Müşteri Kodu"]
+    ).to_numpy()
+    renewal_counts = test_db.groupby("Müşteri Kodu", observed=True)[
+        "Yenileme Durumu"
+    ].sum()
+    test_db["Number of Past Renewals"] = renewal_counts.reindex(
+        test_db["Müşteri Kodu"]
+    ).to_numpy()
+    return compact_frame(test_db, downcast_numeric=False), category_mappings
+
+
+def bin_features(test_db: pd.DataFrame, num_ranges: int = NUM_RANGES):
+    # Kategorilere Ayırma: sınırlar bir kez öğrenilir ve modelle birlikte
+    # saklanır; yeni sözleşmeler aynı sınırlarla etiketlenir (bkz. binning.py)
+    bins = fit_bins(test_db, num_ranges)
+    test_db = apply_bins(test_db, bins)
 
     print(f"Total number of rows after transformations: {test_db.shape[0]}")
-    test_db.to_excel(os.path.join(output_dir, "test_db.xlsx"), sheet_name="a")
+    return test_db, bins
+
 
+def model_columns(test_db: pd.DataFrame):
     # Rangeler oluştuktan sonra düşürülecek kolonlar
     columns_to_drop = [
         "Total Usage",
@@ -780,15 +453,13 @@ def process_excel_files(
         f"Data shape after cleaning: {testt_db.shape[0]} rows, {testt_db.shape[1]} columns"
     )
     print(testt_db.columns.tolist())
+    return testt_db
 
-    # Export test_db (original) if you want
-    output_path = os.path.join(output_dir, "HAZIR_DB.xlsx")
-    testt_db.to_excel(output_path, index=False)
 
+def train_model(testt_db: pd.DataFrame, train_ratio: float = TRAIN_RATIO):
     # LOGISTIC REGRESSION - sine eren
 
     # PARAMETERS
-    train_ratio = 0.80
     sort_column = "Başlangıç T."
     target_col = "Yenileme Durumu"
 
@@ -809,14 +480,16 @@ def process_excel_files(
     X = testt_db.drop(columns=[target_col])
 
     X = X.drop(columns=["Başlangıç T."], errors="ignore")
-    X = X.astype(str)
+    # Encoder str kategoriler bekler; category ile her değer bir kez tutulur
+    X = pd.DataFrame({col: str_categorical(X[col]) for col in X.columns})
     # STEP 3: Meaningful Base Category Selection
     base_profile = {}
     all_renewal_tables = {}
 
     for col in X.columns:
         temp = testt_db[[col, target_col]].dropna()
-        stats = temp.groupby(col)[target_col].agg(["count", "mean"])
+        # Etiketli satırlarda görülmeyen kategoriler baz olamaz, atlanır
+        stats = temp.groupby(col, observed=True)[target_col].agg(["count", "mean"])
         stats.columns = ["sample_size", "renewal_rate"]
         stats = stats.sort_values(by="sample_size", ascending=False)
         all_renewal_tables[col] = stats
@@ -858,12 +531,6 @@ def process_excel_files(
         list(base_profile.items()), columns=["Feature", "Base_Category"]
     )
 
-    # Save it to Excel
-    base_profile_df.to_excel(r"processed/base_profile.xlsx", index=False)
-    base_profile_df.to_excel(os.path.join(FIXED_DIR, "base_profile.xlsx"), index=False)
-
-    print("\nBase profile has been exported to 'processed/base_profile.xlsx'.")
-
     # STEP 5: Train-Test Split (Time-Based)
     split_index = int(len(X) * train_ratio)
     X_train_raw, X_test_raw = X.iloc[:split_index], X.iloc[split_index:]
@@ -910,32 +577,35 @@ def process_excel_files(
 
     # Correct coefficient extraction
     coefficients_df = pd.DataFrame(
-        log_model.coef_[0], index=encoded_columns, columns=["Feature", "Coefficients"]
+        {"Feature": encoded_columns, "Coefficient": log_model.coef_[0]}
     )
 
     # Opsiyonel: Temel müşteri için yenileme olasılığı
     p_baseline = 1 / (1 + np.exp(-log_model.intercept_[0]))
     print("📈 Basis customer'ın yenileme olasılığı: {:.3f}".format(p_baseline))
 
-    # Export to Excel
-    coefficients_df.to_excel(
-        os.path.join(output_dir, "logistic_regression_coefficients.xlsx"),
-        sheet_name="Coefficients",
-    )
-
-    print("Coefficients have been exported to 'logistic_regression_coefficients.xlsx'.")
-
-    # Load the logistic regression coefficients Excel file
-    coefficients_file_path = os.path.join(
-        output_dir, "logistic_regression_coefficients.xlsx"
-    )
-    coefficients_df = pd.read_excel(coefficients_file_path)
+    # Model kaydında saklananlar (bkz. model_registry.py)
+    training_info = {
+        "encoder_categories": dict(zip(X.columns, categories)),
+        "metrics": {
+            "accuracy": float(accuracy),
+            "confusion_matrix": conf_matrix.tolist(),
+            "classification_report": classification_report(
+                y_test, y_pred, output_dict=True
+            ),
+            "train_rows": len(X_train),
+            "test_rows": len(X_test),
+        },
+    }
+    return log_model, base_profile_df, coefficients_df, training_info
 
-    # Load the customer data Excel file
-    customer_file_path = os.path.join(output_dir, "test_db.xlsx")
-    customer_df = pd.read_excel(customer_file_path)
 
-    customer_df = pd.read_excel(customer_file_path)
+def score_pending(
+    coefficients_df: pd.DataFrame,
+    customer_df: pd.DataFrame,
+    cutoff_date: str,
+    intercept,
+):
     cutoff = pd.to_datetime(cutoff_date)
 
     pending = customer_df[
@@ -943,61 +613,125 @@ def process_excel_files(
         & (pd.to_datetime(customer_df["Ek Süreli Bitiş T."], errors="coerce") <= cutoff)
     ].copy()
 
-    # Rename the column for coefficients (keep Feature as column, do NOT set it as index)
-    coefficients_df.columns = ["Feature", "Coefficient"]
-
-    # Define the relevant categorical columns
-    selected_columns = [
-        "Müşteri Kodu",
-        "Üyelik Adı",
-        "Cinsiyet",
-        "Medeni Durumu",
-        "Söz. Türü",
-        "Overall Usage Percentage (%)_Range",
-        "Last 30 Days Utilization (%)_Range",
-        "Average_Visit_Duration_Range",
-        "Aranma Sayısı_Range",
-        "Unit Price (TL per day)_Range",
-        "Renewal Percentage_Range",
-        "Sözleşme Yaşı_Range",
-    ]
-    additonal_columns = ["Ek Süreli Bitiş T."]
-
-    # Create a copy of customer data for processing
-    customer_scores = pending[["Sözleşme No"] + selected_columns].copy()
-
-    # Initialize score with intercept
-    intercept = log_model.intercept_[0]
-    customer_scores["Score"] = intercept
-
-    # Compute Score without using index
-    for feature in selected_columns:
-        for i, row in customer_scores.iterrows():
-            feature_category = f"{feature}_{row[feature]}"
-            matched_row = coefficients_df[
-                coefficients_df["Feature"] == feature_category
-            ]
-            if not matched_row.empty:
-                customer_scores.at[i, "Score"] += matched_row["Coefficient"].values[0]
-
-    # Compute Probability
-    customer_scores["Probability"] = 1 / (1 + np.exp(-customer_scores["Score"]))
-
-    # Define thresholds
-    thresholds = [0.5]
-
-    # Assign Class for each threshold
-    for threshold in thresholds:
-        class_column = f"Class_{threshold}"
-        customer_scores[class_column] = customer_scores["Probability"].apply(
-            lambda x: 1 if x >= threshold else 0
-        )
+    # Katsayı tablosu feature -> kategori -> ağırlık indeksine çevrilir,
+    # bekleyen müşterilerin hepsi tek geçişte puanlanır
+    coefficient_index = build_coefficient_index(coefficients_df)
+    customer_scores = score_customers(pending, coefficient_index, intercept)
 
     # Sort by Probability
     output_df = customer_scores.sort_values(by="Probability", ascending=False)
+    return output_df
 
-    # Save results
-    output_file = os.path.join(output_dir, "customer_probabilities_and_classes.xlsx")
-    output_df.to_excel(output_file, index=False)
 
-    print(f"Results with probabilities and class thresholds saved to {output_file}")
+def process_excel_files(
+    uyelik_sozlesmeleri_path: str,
+    musteriler_path: str,
+    iptal_listesi_path: str,
+    aktiviteler_dir: str,
+    giriş_çıkış_dir: str,
+    output_dir: str,
+    cutoff_date: str,
+    num_ranges: int = NUM_RANGES,
+    train_ratio: float = TRAIN_RATIO,
+    export_format: str = DEFAULT_EXPORT_FORMAT,
+):
+    # TÜİK CPI tablosu yerel store'dan (ağa gitmez, bkz. cpi.py); tablo yoksa
+    # çalışma uzun aşamalardan önce hata verir
+    cpi_lookup = load_cpi_lookup()
+
+    # Her aşamanın çıktısı girdilerinin ve parametrelerinin anahtarıyla
+    # checkpoint'lenir (bkz. pipeline.py); anahtarlar zincirlendiği için
+    # yalnızca girdisi değişen aşama ve sonrakiler yeniden çalışır
+    merge_key = stage_key(
+        "merge", file_digest(uyelik_sozlesmeleri_path), file_digest(musteriler_path)
+    )
+    merged_data = run_stage(
+        "merge", merge_key, merge_contracts, uyelik_sozlesmeleri_path, musteriler_path
+    )
+
+    clean_key = stage_key("clean", merge_key, file_digest(iptal_listesi_path))
+    final_data = run_stage(
+        "clean", clean_key, clean_contracts, merged_data, iptal_listesi_path
+    )
+
+    renewal_key = stage_key("renewal", clean_key)
+    final_data = run_stage("renewal", renewal_key, label_contracts, final_data)
+
+    visits_key = stage_key("visits", renewal_key, giris_cikis_digest(giriş_çıkış_dir))
+    sine_data = run_stage(
+        "visits", visits_key, assign_visits, final_data, giriş_çıkış_dir
+    )
+
+    usage_key = stage_key("usage", visits_key)
+    results_df = run_stage(
+        "usage", usage_key, build_usage_features, final_data, sine_data
+    )
+
+    calls_key = stage_key("calls", usage_key, reports_digest(aktiviteler_dir))
+    results_df = run_stage(
+        "calls", calls_key, add_call_counts, results_df, final_data, aktiviteler_dir
+    )
+
+    cpi_key = stage_key("cpi", calls_key, frame_digest(cpi_lookup))
+    contracts_df = run_stage("cpi", cpi_key, adjust_for_cpi, results_df, cpi_lookup)
+
+    features_key = stage_key("features", cpi_key)
+    test_db, category_mappings = run_stage(
+        "features", features_key, prepare_features, contracts_df
+    )
+    save_category_mappings(
+        category_mappings, os.path.join(output_dir, CATEGORY_MAPPINGS_FILE)
+    )
+
+    binning_key = stage_key("binning", features_key, num_ranges)
+    test_db, bins = run_stage("binning", binning_key, bin_features, test_db, num_ranges)
+    save_bins(bins, os.path.join(output_dir, BINS_FILE))
+    testt_db = model_columns(test_db)
+
+    training_key = stage_key("training", binning_key, train_ratio)
+    log_model, base_profile_df, coefficients_df, training_info = run_stage(
+        "training", training_key, train_model, testt_db, train_ratio
+    )
+    register_model(
+        log_model,
+        base_profile_df,
+        coefficients_df,
+        training_info,
+        bins,
+        category_mappings,
+        frame_digest(testt_db),
+        {"train_ratio": train_ratio},
+    )
+
+    # Aşamalar birbirine frame geçirir; xlsx'ler yalnızca en sonda, indirilecek
+    # çıktılar için bir kez yazılır
+    scoring_key = stage_key("scoring", training_key, cutoff_date)
+    output_df = run_stage(
+        "scoring",
+        scoring_key,
+        score_pending,
+        coefficients_df,
+        test_db,
+        cutoff_date,
+        log_model.intercept_[0],
+    )
+
+    # Birbirinden bağımsız çıktılar paralel yazılır (bkz. export.py);
+    # test_db'yi /upload_excel bir sonraki partial çalışmada müşteri verisi
+    # olarak okur
+    export_artifacts(
+        output_dir,
+        [
+            ("adjusted_contracts_with_cpi", contracts_df, {}),
+            ("test_db", test_db, {"sheet_name": "a", "index": True}),
+            ("HAZIR_DB", testt_db, {}),
+            ("base_profile", base_profile_df, {}),
+            (
+                "logistic_regression_coefficients",
+                coefficients_df,
+                {"sheet_name": "Coefficients"},
+            ),
+            ("customer_probabilities_and_classes", output_df, {}),
+        ],
+        export_format,
+    )
@@ -0,0 +1,228 @@
+import io
+import json
+import os
+import shutil
+import zipfile
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+import jobs
+import model_server
+from app import app
+from batch_scoring import stream_scores
+from model_registry import register_model
+from workspace import INPUTS_DIR, mark_run_complete
+
+CONTRACTS = [
+    {"Sözleşme No": "S1", "Üyelik Adı": "SILVER", "Sözleşme Yaşı": 25},
+    {"Sözleşme No": "S2", "Üyelik Adı": "PLATINUM", "Sözleşme Yaşı": 45},
+    {"Sözleşme No": "S3", "Üyelik Adı": "GOLD", "Sözleşme Yaşı_Range": "[18.00-30.00)"},
+    {"Sözleşme No": "S4", "Üyelik Adı": None, "Sözleşme Yaşı": 99},
+]
+
+# intercept + Üyelik Adı ağırlığı + Sözleşme Yaşı_Range ağırlığı
+EXPECTED_SCORES = [-0.25 + 0.5 + 1.0, -0.25 - 2.0, -0.25 + 1.0, -0.25]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # models/ çalışma klasörüne göre; her test kendi registry'si ve boş
+    # bellek modeliyle başlar
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(model_server, "_resident", {})
+    monkeypatch.setattr(jobs, "_jobs", {})
+    return TestClient(app)
+
+
+@pytest.fixture
+def model(client):
+    register_model(
+        SimpleNamespace(intercept_=np.array([-0.25])),
+        pd.DataFrame({"Feature": ["Üyelik Adı"], "Base_Category": ["GOLD"]}),
+        pd.DataFrame(
+            {
+                "Feature": [
+                    "Üyelik Adı_SILVER",
+                    "Üyelik Adı_Others",
+                    "Sözleşme Yaşı_Range_[18.00-30.00)",
+                ],
+                "Coefficient": [0.5, -2.0, 1.0],
+            }
+        ),
+        {"encoder_categories": {"Üyelik Adı": ["SILVER", "Others"]}, "metrics": {}},
+        {
+            "Sözleşme Yaşı": {
+                "edges": [18.0, 30.0, 70.0],
+                "labels": ["[18.00-30.00)", "[30.00-70.00)"],
+            }
+        },
+        {"Üyelik Adı": ["PLATINUM"]},
+        "abc",
+        {"num_ranges": 7},
+    )
+    return client
+
+
+def test_score(model):
+    response = model.post("/score", json={"contracts": CONTRACTS})
+
+    assert response.status_code == 200
+    scores = response.json()["scores"]
+    assert [score["Sözleşme No"] for score in scores] == ["S1", "S2", "S3", "S4"]
+    np.testing.assert_allclose([s["Score"] for s in scores], EXPECTED_SCORES)
+    probabilities = 1 / (1 + np.exp(-np.array(EXPECTED_SCORES)))
+    np.testing.assert_allclose([s["Probability"] for s in scores], probabilities)
+    assert [s["Class_0.5"] for s in scores] == (probabilities >= 0.5).astype(
+        int
+    ).tolist()
+
+
+def test_score_without_model(client):
+    assert client.post("/score", json={"contracts": CONTRACTS}).status_code == 404
+    assert client.post("/score/batch", content=b"").status_code == 404
+
+
+def test_score_batch_csv_matches_score(model):
+    body = pd.DataFrame(CONTRACTS).to_csv(index=False)
+    # Tırnak içindeki satır sonu tek bir alan olarak okunmalı
+    body += '"S5","SILVER\nX",25,\n'
+
+    response = model.post("/score/batch?format=csv", content=body.encode("utf-8"))
+
+    assert response.status_code == 200
+    assert response.headers["X-Model-Version"]
+    scores = pd.read_csv(io.StringIO(response.text))
+    assert scores["Sözleşme No"].tolist() == ["S1", "S2", "S3", "S4", "S5"]
+    np.testing.assert_allclose(scores["Score"], EXPECTED_SCORES + [-0.25 + 1.0])
+
+
+def test_score_batch_ndjson_matches_score(model):
+    body = "".join(json.dumps(contract) + "\n" for contract in CONTRACTS) + "\n"
+
+    response = model.post("/score/batch?format=ndjson", content=body.encode("utf-8"))
+
+    assert response.status_code == 200
+    scores = [json.loads(line) for line in response.text.splitlines()]
+    assert (
+        scores == model.post("/score", json={"contracts": CONTRACTS}).json()["scores"]
+    )
+
+
+def test_score_batch_empty_and_invalid(model):
+    response = model.post("/score/batch?format=csv", content=b"")
+    assert response.status_code == 200
+    assert response.text == "Sözleşme No,Score,Probability,Class_0.5\n"
+
+    assert model.post("/score/batch?format=ndjson", content=b"").text == ""
+    assert model.post("/score/batch?format=xml", content=b"").status_code == 400
+
+
+@pytest.mark.parametrize(
+    "batch_format, body, error",
+    [
+        ("csv", "Sözleşme No,Sözleşme Yaşı\nS1,25\nS2,abc\n", "row 2"),
+        ("csv", "Sözleşme No,Sözleşme Yaşı\nS1,25\nS2,30,x,y\n", "Expected 2"),
+        ("ndjson", '{"Sözleşme No": "S1"}\n{"Sözleşme No": \n', "Expecting value"),
+        ("ndjson", '{"Sözleşme No": "S1", "Sözleşme Yaşı": {"a": 1}}\n', "row 1"),
+    ],
+)
+def test_score_batch_rejects_invalid_rows_before_streaming(
+    model, batch_format, body, error
+):
+    # Hata akış başladıktan sonra değil, 422 olarak döner
+    response = model.post(
+        f"/score/batch?format={batch_format}", content=body.encode("utf-8")
+    )
+
+    assert response.status_code == 422
+    assert error in response.json()["detail"]
+
+
+def test_stream_scores_chunks_match_single_pass(model):
+    model_dict = model_server.resident_model()
+    body = pd.DataFrame(CONTRACTS * 5).to_csv(index=False).encode("utf-8")
+
+    single = b"".join(stream_scores(io.BytesIO(body), "csv", model_dict))
+    chunked = b"".join(stream_scores(io.BytesIO(body), "csv", model_dict, chunk_rows=3))
+
+    assert chunked == single
+
+
+def _add_job(future: Future) -> str:
+    job_id = f"job{len(jobs._jobs)}"
+    jobs._jobs[job_id] = {
+        "kind": "run_pipeline_job",
+        "submitted_at": "2024-01-01T00:00:00",
+        "future": future,
+    }
+    return job_id
+
+
+def test_jobs(client, tmp_path):
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.get("/jobs/missing/result").status_code == 404
+
+    queued = _add_job(Future())
+    assert client.get(f"/jobs/{queued}").json()["status"] == "queued"
+    assert client.get(f"/jobs/{queued}/result").status_code == 409
+
+    running = Future()
+    running.set_running_or_notify_cancel()
+    running_id = _add_job(running)
+    assert client.get(f"/jobs/{running_id}").json()["status"] == "running"
+    assert client.get(f"/jobs/{running_id}/result").status_code == 409
+
+    failed = Future()
+    failed.set_exception(ValueError("broken input"))
+    failed_id = _add_job(failed)
+    assert client.get(f"/jobs/{failed_id}").json()["error"] == "broken input"
+    assert client.get(f"/jobs/{failed_id}/result").status_code == 500
+
+
+def test_job_result(client, tmp_path):
+    run_dir = tmp_path / "runs" / "run1"
+    os.makedirs(run_dir / INPUTS_DIR)
+    (run_dir / INPUTS_DIR / "input.xlsx").write_bytes(b"input")
+    (run_dir / "test_db.parquet").write_bytes(b"result")
+    mark_run_complete(str(run_dir))
+    finished = Future()
+    finished.set_result(str(run_dir))
+    job_id = _add_job(finished)
+
+    response = client.get(f"/jobs/{job_id}/result")
+
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.namelist() == ["test_db.parquet"]
+        assert archive.read("test_db.parquet") == b"result"
+
+    # Saklama politikası çalışma klasörünü sildiyse
+    shutil.rmtree(run_dir)
+    assert client.get(f"/jobs/{job_id}/result").status_code == 410
+
+
+def test_upload_without_cpi_table(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "start_cpi_refresh", lambda: None)
+    monkeypatch.setattr(
+        app_module, "submit_job", lambda *args: pytest.fail("job submitted")
+    )
+    files = [
+        ("files", (name, b"data"))
+        for name in [
+            "Effect_uyelik_sozlesmeleri.xls",
+            "Effect_musteriler.xls",
+            "Effect_iptal_listesi.xls",
+        ]
+    ]
+
+    response = client.post("/upload", files=files)
+
+    assert response.status_code == 400
+    assert "upload the TÜİK xls" in response.json()["detail"]
+    assert os.listdir(tmp_path / "runs") == []
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from binning import apply_bins, fit_bins, range_label
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    n = 1000
+    df = pd.DataFrame(
+        {
+            "Sözleşme Yaşı": rng.integers(18, 70, n).astype(float),
+            # Çok sayıda sıfır: tekrar eden quantile sınırları düşer
+            "Aranma Sayısı": np.where(
+                rng.random(n) < 0.6, 0, rng.integers(1, 9, n)
+            ).astype(float),
+            "Last 30 Days Utilization (%)": rng.uniform(0, 100, n).round(1),
+        }
+    )
+    df.loc[::9, "Sözleşme Yaşı"] = np.nan
+    df.loc[::31, "Last 30 Days Utilization (%)"] = 0
+    return df
+
+
+def _labels(values: pd.Series) -> list:
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def test_fit_bins_matches_qcut():
+    df = _frame()
+    columns = ["Sözleşme Yaşı", "Aranma Sayısı"]
+
+    bins = fit_bins(df, 7, columns=columns, custom_ranges={})
+    binned = apply_bins(df, bins)
+
+    for column in columns:
+        _, edges = pd.qcut(df[column], q=7, retbins=True, duplicates="drop")
+        labels = [f"[{edges[i]:.2f}-{edges[i + 1]:.2f})" for i in range(len(edges) - 1)]
+        expected = pd.qcut(df[column], q=7, labels=labels, duplicates="drop")
+
+        np.testing.assert_array_equal(bins[column]["edges"], edges)
+        assert bins[column]["labels"] == labels
+        assert _labels(binned[f"{column}_Range"]) == _labels(expected)
+
+
+def test_custom_ranges_match_cut():
+    df = _frame()
+    column = "Last 30 Days Utilization (%)"
+    edges = [0, 1, 30, 100]
+
+    binned = apply_bins(df, fit_bins(df, 7, columns=[column]))
+
+    labels = [f"[{edges[i]:.2f}-{edges[i + 1]:.2f})" for i in range(len(edges) - 1)]
+    expected = pd.cut(df[column], bins=edges, labels=labels, include_lowest=True)
+    assert _labels(binned[f"{column}_Range"]) == _labels(expected)
+
+
+def test_range_label_matches_apply_bins():
+    spec = {"edges": [0.0, 1.0, 30.0, 100.0], "labels": ["a", "b", "c"]}
+    values = [None, np.nan, -1, 0, 0.5, 1, 1.5, 30, 99.9, 100, 100.1, "12"]
+
+    binned = apply_bins(pd.DataFrame({"x": values}), {"x": spec})
+
+    assert [range_label(value, spec) for value in values] == _labels(binned["x_Range"])
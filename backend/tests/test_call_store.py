@@ -0,0 +1,46 @@
+import pandas as pd
+
+import call_store
+from call_store import load_call_counts
+
+
+def test_store_version_bump_rebuilds_reports(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    reports_dir = tmp_path / "aktivite"
+    reports_dir.mkdir()
+    pd.DataFrame(
+        {
+            "Kodu": ["A", "A", "B"],
+            "Tarih": ["2024-01-05", "2024-03-01", "2024-01-10"],
+        }
+    ).to_excel(reports_dir / "rapor.xlsx", index=False)
+    contracts = pd.DataFrame(
+        {
+            "Müşteri Kodu": ["A", "B"],
+            "Başlangıç T.": pd.to_datetime(["2024-01-01", "2024-01-01"]),
+            "Ek Süreli Bitiş T.": pd.to_datetime(["2024-12-31", "2024-12-31"]),
+            "Sözleşme No": ["S1", "S2"],
+        }
+    )
+    store_dir = str(tmp_path / "store")
+    reads = []
+    read_calls = call_store._read_calls
+
+    def counting_read(file_path):
+        reads.append(file_path)
+        return read_calls(file_path)
+
+    monkeypatch.setattr(call_store, "_read_calls", counting_read)
+
+    counts = load_call_counts(str(reports_dir), contracts, store_dir)
+    load_call_counts(str(reports_dir), contracts, store_dir)
+    assert len(reads) == 1
+    digest = call_store.reports_digest(str(reports_dir), store_dir)
+
+    monkeypatch.setattr(call_store, "STORE_VERSION", "test")
+    rebuilt = load_call_counts(str(reports_dir), contracts, store_dir)
+
+    assert len(reads) == 2
+    assert call_store.reports_digest(str(reports_dir), store_dir) != digest
+    pd.testing.assert_series_equal(rebuilt, counts)
+    assert dict(counts) == {"S1": 2, "S2": 1}
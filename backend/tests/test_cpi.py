@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import cpi
+from cpi import adjust_amounts, load_cpi_lookup
+
+
+def _cpi_lookup():
+    rng = np.random.default_rng(0)
+    months = [str(month) for month in range(1, 13)]
+    table = pd.DataFrame(
+        rng.uniform(100, 900, (5, 12)).round(2),
+        index=pd.Index([2019, 2020, 2021, 2022, 2023], name="Year"),
+        columns=months,
+    )
+    table.loc[2020, "3"] = np.nan
+    table.loc[2021, "7"] = 0
+    # Yılın son ayları henüz yayımlanmamış
+    table.loc[2023, ["10", "11", "12"]] = np.nan
+    return table
+
+
+def _loop_adjust(start_dates, amounts, cpi_lookup):
+    # Vektörleştirilmeden önceki satır satır karşılık
+    adjusted = []
+    for start, amount in zip(start_dates, amounts):
+        start = pd.to_datetime(start, errors="coerce")
+        if pd.isna(start) or amount == 0 or start.year not in cpi_lookup.index:
+            adjusted.append(amount)
+            continue
+        start_index = cpi_lookup.loc[start.year, cpi_lookup.columns[start.month - 1]]
+        latest_index = cpi_lookup.iloc[-1].dropna().values[-1]
+        if pd.isna(start_index) or start_index == 0:
+            adjusted.append(amount)
+        else:
+            adjusted.append(amount * (latest_index / start_index))
+    return adjusted
+
+
+def test_adjust_amounts_matches_loop():
+    rng = np.random.default_rng(1)
+    n = 400
+    start_dates = pd.Series(
+        pd.Timestamp("2018-06-01")
+        + pd.to_timedelta(rng.integers(0, 6 * 365, n), unit="D")
+    )
+    start_dates[::19] = pd.NaT
+    amounts = pd.Series(rng.uniform(0, 5000, n).round(2))
+    amounts[::13] = 0
+    amounts[::29] = np.nan
+    cpi_lookup = _cpi_lookup()
+
+    adjusted = adjust_amounts(start_dates, amounts, cpi_lookup)
+
+    np.testing.assert_allclose(
+        adjusted, _loop_adjust(start_dates, amounts, cpi_lookup), rtol=1e-12
+    )
+
+
+def test_load_without_stored_table_fails_without_fetching(tmp_path, monkeypatch):
+    def no_network(*args, **kwargs):
+        raise AssertionError("pipeline must not fetch the CPI table")
+
+    monkeypatch.setattr(cpi.requests, "get", no_network)
+
+    with pytest.raises(FileNotFoundError, match="upload the TÜİK xls"):
+        load_cpi_lookup(str(tmp_path))
@@ -0,0 +1,43 @@
+import os
+import time
+
+import pandas as pd
+
+from excel_cache import read_excel_cached
+
+
+def _workbook(tmp_path, name):
+    path = str(tmp_path / f"{name}.xlsx")
+    pd.DataFrame({"x": [name]}).to_excel(path, index=False)
+    return path
+
+
+def _entry(cache_dir, before: set) -> str:
+    (name,) = set(os.listdir(cache_dir)) - before
+    return name
+
+
+def test_idle_entries_are_pruned(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    a, b, c = (_workbook(tmp_path, name) for name in "abc")
+
+    read_excel_cached(a, cache_dir)
+    entry_a = _entry(cache_dir, set())
+    read_excel_cached(b, cache_dir)
+    entry_b = _entry(cache_dir, {entry_a})
+
+    # İki girdi de 10 gündür okunmamış görünsün
+    old = time.time() - 10 * 86400
+    for name in (entry_a, entry_b):
+        os.utime(os.path.join(cache_dir, name), (old, old))
+
+    # Cache'ten okunan girdi kullanıldı sayılır; yeni girdi yazılınca yalnızca
+    # okunmayan silinir
+    assert read_excel_cached(a, cache_dir)["x"].tolist() == ["a"]
+    read_excel_cached(c, cache_dir)
+
+    remaining = set(os.listdir(cache_dir))
+    assert entry_a in remaining
+    assert entry_b not in remaining
+    assert len(remaining) == 2
+    assert read_excel_cached(b, cache_dir)["x"].tolist() == ["b"]
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import export
+from export import export_artifacts, read_artifact
+
+
+def _frames():
+    rng = np.random.default_rng(0)
+    contracts = pd.DataFrame(
+        {
+            "Sözleşme No": [f"S{i}" for i in range(300)],
+            "Üyelik Adı": pd.Categorical(rng.choice(["GOLD", "SILVER", None], 300)),
+            "Tutar ( TL )": rng.normal(1000, 200, 300).round(2),
+            "Başlangıç T.": pd.date_range("2020-01-01", periods=300, freq="D"),
+        }
+    )
+    contracts.loc[::7, "Tutar ( TL )"] = np.nan
+    scores = pd.DataFrame(
+        {
+            "Sözleşme No": contracts["Sözleşme No"],
+            "Probability": rng.random(300),
+            "Class_0.5": rng.integers(0, 2, 300),
+        }
+    )
+    return [
+        ("adjusted_contracts_with_cpi", contracts, {}),
+        ("test_db", contracts, {"sheet_name": "a", "index": True}),
+        ("customer_probabilities_and_classes", scores, {}),
+        ("base_profile", scores.head(5), {}),
+    ]
+
+
+@pytest.mark.parametrize("export_format", ["xlsx", "parquet"])
+def test_parallel_export_matches_serial(tmp_path, monkeypatch, export_format):
+    # Küçük frame'ler de worker'lara gitsin; paralel yol 1 CPU'da da çalışır.
+    # parquet'te yalnızca arayüzün xlsx kopyaları worker'lara gider
+    monkeypatch.setattr(export, "PARALLEL_MIN_ROWS", 1)
+    calls = []
+    write_parallel = export._write_parallel
+
+    def spy(pooled, local, max_workers, tmp_dir):
+        calls.append((len(pooled), len(local)))
+        return write_parallel(pooled, local, max_workers, tmp_dir)
+
+    monkeypatch.setattr(export, "_write_parallel", spy)
+
+    serial_dir, parallel_dir = tmp_path / "serial", tmp_path / "parallel"
+    serial_dir.mkdir()
+    parallel_dir.mkdir()
+    artifacts = _frames()
+    serial = export_artifacts(str(serial_dir), artifacts, export_format, 1)
+    parallel = export_artifacts(str(parallel_dir), artifacts, export_format, 2)
+
+    assert calls and calls[0][0] >= 2
+    assert sorted(os.listdir(serial_dir)) == sorted(os.listdir(parallel_dir))
+    assert len(serial) == len(parallel)
+    for path in serial:
+        other = os.path.join(parallel_dir, os.path.basename(path))
+        if path.endswith(".xlsx"):
+            expected = pd.read_excel(path, sheet_name=None)
+            actual = pd.read_excel(other, sheet_name=None)
+            assert expected.keys() == actual.keys()
+            for sheet in expected:
+                pd.testing.assert_frame_equal(expected[sheet], actual[sheet])
+        else:
+            pd.testing.assert_frame_equal(read_artifact(path), read_artifact(other))
+
+
+def test_small_exports_stay_serial(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        export,
+        "_write_parallel",
+        lambda *args: pytest.fail("short frames should not start workers"),
+    )
+    paths = export_artifacts(str(tmp_path), _frames(), "xlsx", max_workers=4)
+    assert len(paths) == 4
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".")]
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from interval_join import assign_intervals, count_in_intervals
+
+
+def _data(seed: int):
+    rng = np.random.default_rng(seed)
+    n_contracts, n_events = 200, 1000
+    starts = pd.Timestamp("2020-01-01") + pd.to_timedelta(
+        rng.integers(0, 60, n_contracts), unit="D"
+    )
+    contracts = pd.DataFrame(
+        {
+            "Müşteri Kodu": rng.choice(["A", "B", "C", "D", None], n_contracts),
+            "Başlangıç T.": starts,
+            # Çakışan aralıklar ve aynı gün başlayan sözleşmeler bol olsun
+            "Ek Süreli Bitiş T.": starts
+            + pd.to_timedelta(rng.integers(-1, 30, n_contracts), unit="D"),
+            "Sözleşme No": [f"S{i}" for i in range(n_contracts)],
+        }
+    )
+    contracts.loc[::17, "Ek Süreli Bitiş T."] = pd.NaT
+    events = pd.DataFrame(
+        {
+            "Kod": rng.choice(["A", "B", "C", "D", "E", None], n_events),
+            "Tarih": pd.Timestamp("2019-12-20")
+            + pd.to_timedelta(rng.integers(0, 100 * 24, n_events), unit="h"),
+        }
+    )
+    events.loc[::23, "Tarih"] = pd.NaT
+    return events, contracts
+
+
+def _loop_assign(events, contracts):
+    # Vektörleştirilmeden önceki satır satır karşılık
+    result = []
+    for _, row in events.iterrows():
+        matches = contracts[
+            (contracts["Müşteri Kodu"] == row["Kod"])
+            & (contracts["Başlangıç T."] <= row["Tarih"])
+            & (contracts["Ek Süreli Bitiş T."] >= row["Tarih"])
+        ]
+        result.append(None if matches.empty else matches.iloc[0]["Sözleşme No"])
+    return result
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("order", ["sorted", "shuffled"])
+def test_assign_intervals_matches_loop(seed, order):
+    events, contracts = _data(seed)
+    if order == "sorted":
+        contracts = contracts.sort_values(
+            ["Müşteri Kodu", "Başlangıç T."], kind="stable"
+        )
+    else:
+        contracts = contracts.sample(frac=1, random_state=seed)
+
+    assigned = assign_intervals(events, contracts, "Kod", "Tarih")
+
+    assert assigned.index.equals(events.index)
+    assert assigned.tolist() == _loop_assign(events, contracts)
+
+
+def test_count_in_intervals_matches_loop():
+    events, contracts = _data(3)
+    lower = contracts["Başlangıç T."]
+    upper = contracts["Ek Süreli Bitiş T."]
+
+    counts = count_in_intervals(
+        events, contracts, "Kod", "Tarih", "Müşteri Kodu", lower, upper
+    )
+
+    expected = [
+        int(
+            (
+                (events["Kod"] == key)
+                & (events["Tarih"] >= low)
+                & (events["Tarih"] <= high)
+            ).sum()
+        )
+        for key, low, high in zip(contracts["Müşteri Kodu"], lower, upper)
+    ]
+    assert counts.tolist() == expected
@@ -0,0 +1,85 @@
+import json
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from model_registry import (
+    CURRENT_FILE,
+    current_model_version,
+    find_model,
+    load_model,
+    model_base_profile,
+    model_coefficients,
+    register_model,
+)
+
+
+def register(models_dir, training_data_hash="abc", params=None):
+    return register_model(
+        SimpleNamespace(intercept_=np.array([-0.25])),
+        pd.DataFrame(
+            {
+                "Feature": ["Üyelik Adı", "Başlangıç T."],
+                "Base_Category": ["GOLD", pd.Timestamp("2024-01-01")],
+            }
+        ),
+        pd.DataFrame(
+            {
+                "Feature": ["Üyelik Adı_SILVER", "Cinsiyet_Kadın"],
+                "Coefficient": np.array([0.5, -1.5]),
+            }
+        ),
+        {
+            "encoder_categories": {"Üyelik Adı": ["SILVER"], "Cinsiyet": ["Kadın"]},
+            "metrics": {"accuracy": 0.75},
+        },
+        {"Sözleşme Yaşı": {"edges": [18.0, 30.0, 70.0], "labels": ["a", "b"]}},
+        {"Üyelik Adı": ["PLATINUM"]},
+        training_data_hash,
+        params or {"num_ranges": 7},
+        models_dir,
+    )
+
+
+def test_register_find_load(tmp_path):
+    models_dir = str(tmp_path)
+    assert find_model("abc", {"num_ranges": 7}, models_dir) is None
+    assert current_model_version(models_dir) is None
+
+    version = register(models_dir)
+
+    assert find_model("abc", {"num_ranges": 7}, models_dir) == version
+    assert current_model_version(models_dir) == version
+    bundle = load_model(models_dir=models_dir)
+    assert bundle["intercept"] == -0.25
+    assert bundle["features"] == ["Üyelik Adı", "Cinsiyet"]
+    assert model_coefficients(bundle)["Coefficient"].tolist() == [0.5, -1.5]
+    assert model_base_profile(bundle)["Base_Category"].tolist() == [
+        "GOLD",
+        "2024-01-01 00:00:00",
+    ]
+
+
+def test_register_again_keeps_bundle(tmp_path):
+    models_dir = str(tmp_path)
+    first = register(models_dir)
+    second = register(models_dir, params={"num_ranges": 5})
+    assert second != first
+    assert current_model_version(models_dir) == second
+
+    bundle_path = os.path.join(models_dir, first, "bundle.json")
+    with open(bundle_path) as f:
+        created_at = json.load(f)["created_at"]
+
+    # Aynı veri ve parametreler: bundle yeniden yazılmaz, current geri döner
+    assert register(models_dir) == first
+    with open(bundle_path) as f:
+        assert json.load(f)["created_at"] == created_at
+    assert current_model_version(models_dir) == first
+
+    current_path = os.path.join(models_dir, CURRENT_FILE)
+    mtime = os.stat(current_path).st_mtime_ns
+    register(models_dir)
+    assert os.stat(current_path).st_mtime_ns == mtime
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from pricing import distribute_family_prices, pure_contract_codes, unit_prices
+
+
+def _contracts():
+    rng = np.random.default_rng(0)
+    n = 300
+    starts = pd.Timestamp("2022-01-01") + pd.to_timedelta(
+        rng.integers(0, 300, n), unit="D"
+    )
+    df = pd.DataFrame(
+        {
+            "Başlangıç T.": starts,
+            "Ek Süreli Bitiş T.": starts
+            + pd.to_timedelta(rng.integers(-3, 400, n), unit="D"),
+            "Adjusted Tutar": rng.uniform(0, 9000, n).round(2),
+            "Üyelik Adı": rng.choice(
+                ["GOLD", "FIVE DAYS BİREYSEL", "FIVE DAYS AİLE"], n
+            ),
+            "Sözleşme No": [
+                f"{family}-{member}" if member else str(family)
+                for family, member in zip(
+                    rng.integers(1000, 1080, n), rng.integers(0, 3, n)
+                )
+            ],
+            "Üyelik Tipi": rng.choice(["Asil Üyelik", "Aile Üyeliği"], n),
+        }
+    )
+    df.loc[::11, "Adjusted Tutar"] = 0
+    df.loc[::17, "Ek Süreli Bitiş T."] = pd.NaT
+    return df
+
+
+def _loop_unit_price(row):
+    # Vektörleştirilmeden önceki satır karşılığı
+    start_date, end_date = row["Başlangıç T."], row["Ek Süreli Bitiş T."]
+    if pd.isna(start_date) or pd.isna(end_date) or row["Adjusted Tutar"] == 0:
+        return None
+    if row["Üyelik Adı"] in ["FIVE DAYS BİREYSEL", "FIVE DAYS AİLE"]:
+        duration_days = np.busday_count(
+            start_date.date(), end_date.date() + timedelta(days=1)
+        )
+    else:
+        duration_days = (end_date - start_date).days
+    if duration_days <= 0:
+        return None
+    return row["Adjusted Tutar"] / duration_days
+
+
+def test_unit_prices_match_loop():
+    df = _contracts()
+
+    prices = unit_prices(df)
+
+    expected = df.apply(_loop_unit_price, axis=1).astype(float)
+    np.testing.assert_allclose(prices.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_distribute_family_prices_matches_groupby_apply():
+    df = _contracts()
+    df["Unit Price (TL per day)"] = unit_prices(df)
+    pure_codes = pure_contract_codes(df["Sözleşme No"])
+
+    distributed = distribute_family_prices(
+        df["Unit Price (TL per day)"], pure_codes, df["Üyelik Tipi"]
+    )
+
+    def distribute(group):
+        owner = group[group["Üyelik Tipi"] == "Asil Üyelik"]
+        if not owner.empty:
+            group["Unit Price (TL per day)"] = owner.iloc[0][
+                "Unit Price (TL per day)"
+            ] / len(group)
+        return group
+
+    expected = (
+        df.assign(**{"Pure Sözleşme No": df["Sözleşme No"].str.split("-").str[0]})
+        .groupby("Pure Sözleşme No", group_keys=False)[list(df.columns)]
+        .apply(distribute)
+        .loc[df.index, "Unit Price (TL per day)"]
+    )
+    np.testing.assert_allclose(distributed.to_numpy(), expected.to_numpy(), rtol=1e-12)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from rare_categories import (
+    OTHER_LABEL,
+    apply_category_mappings,
+    fit_category_mappings,
+)
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame(
+        {
+            "Üyelik Adı": rng.choice(
+                ["GOLD", "SILVER", "PLATINUM", "FIVE DAYS AİLE", None],
+                n,
+                p=[0.5, 0.3, 0.1, 0.05, 0.05],
+            ),
+            "Cinsiyet": rng.choice(
+                ["Erkek", "Kadın", "Belirtilmemiş"], n, p=[0.49, 0.49, 0.02]
+            ),
+            "Yenileme Durumu": rng.choice([0.0, 1.0, np.nan], n, p=[0.6, 0.35, 0.05]),
+        }
+    )
+    # Bu kolonda hiç yenilenen yok: hedef sınıfı kolonun tablosunda eksik
+    df["Söz. Türü"] = np.where(df["Yenileme Durumu"] == 1, None, "Yeni")
+    df.loc[:3, ["Söz. Türü", "Yenileme Durumu"]] = ["Güncelleme", 0.0]
+    return df
+
+
+def _loop_mappings(df, columns):
+    # Vektörleştirilmeden önceki kolon başına crosstab
+    mappings = {}
+    for column in columns:
+        table = pd.crosstab(df[column], df["Yenileme Durumu"])
+        row_totals = table.sum(axis=1)
+        column_totals = table.sum(axis=0)
+        grand_total = table.values.sum()
+        expected = pd.DataFrame(
+            [
+                [row_totals[row] * column_totals[col] / grand_total for col in table]
+                for row in table.index
+            ],
+            index=table.index,
+            columns=table.columns,
+        )
+        low = expected[expected < 5].dropna(how="all").index
+        if not low.empty:
+            mappings[column] = set(low)
+    return mappings
+
+
+def test_fit_category_mappings_matches_crosstab_loop():
+    df = _frame()
+    columns = ["Üyelik Adı", "Cinsiyet", "Söz. Türü"]
+
+    mappings = fit_category_mappings(df, columns)
+
+    assert {column: set(values) for column, values in mappings.items()} == (
+        _loop_mappings(df, columns)
+    )
+
+
+def test_apply_category_mappings_keeps_categoricals_equal():
+    df = _frame()
+    mappings = fit_category_mappings(df, ["Üyelik Adı", "Cinsiyet"])
+    categorical = df.astype({"Üyelik Adı": "category", "Cinsiyet": "category"})
+
+    expected = df.copy()
+    for column, values in mappings.items():
+        expected[column] = expected[column].replace(
+            {value: OTHER_LABEL for value in values}
+        )
+
+    for frame in (df, categorical):
+        applied = apply_category_mappings(frame, mappings)
+        for column in mappings:
+            assert (
+                applied[column]
+                .astype(object)
+                .where(applied[column].notna(), None)
+                .tolist()
+                == expected[column].tolist()
+            )
+    assert (
+        OTHER_LABEL
+        in apply_category_mappings(categorical, mappings)["Cinsiyet"].cat.categories
+    )
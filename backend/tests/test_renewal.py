@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from renewal import label_renewals
+
+
+def _loop_labels(df):
+    # Vektörleştirilmeden önceki satır satır karşılık
+    labels = []
+    for i in range(len(df)):
+        status = df.loc[i, "Sözleşme Durumu"]
+        if (
+            i < len(df) - 1
+            and df.loc[i + 1, "Müşteri Kodu"] == df.loc[i, "Müşteri Kodu"]
+        ):
+            next_type = df.loc[i + 1, "Söz. Türü"]
+            next_status = df.loc[i + 1, "Sözleşme Durumu"]
+            renewed = status == "Kapandı" and next_type in ("Yenileme", "Güncelleme")
+            labels.append(int(renewed or next_status == "Başlamadı"))
+        else:
+            labels.append(None if status == "Aktif" else 0)
+    return labels
+
+
+def test_label_renewals_matches_loop():
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame(
+        {
+            "Müşteri Kodu": np.sort(rng.integers(0, 120, n)),
+            "Sözleşme Durumu": rng.choice(
+                ["Kapandı", "Aktif", "Başlamadı", "İptal", None], n
+            ),
+            "Söz. Türü": rng.choice(["Yeni", "Yenileme", "Güncelleme", None], n),
+        }
+    )
+
+    labels = label_renewals(df)
+
+    expected = pd.Series(_loop_labels(df), dtype=float)
+    np.testing.assert_array_equal(labels.to_numpy(), expected.to_numpy())
+    assert labels.index.equals(df.index)
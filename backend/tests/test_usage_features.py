@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from usage_features import compute_usage_features
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    n_contracts, n_visits = 60, 3000
+    starts = pd.Timestamp("2021-01-01") + pd.to_timedelta(
+        rng.integers(0, 200, n_contracts), unit="D"
+    )
+    contracts = pd.DataFrame(
+        {
+            "Müşteri Kodu": rng.choice(["A", "B", "C", "D"], n_contracts),
+            "Başlangıç T.": starts,
+            "Ek Süreli Bitiş T.": starts
+            + pd.to_timedelta(rng.integers(-5, 120, n_contracts), unit="D"),
+            "Üyelik Adı": rng.choice(
+                ["GOLD", "FIVE DAYS AİLE", "FIVE DAYS BİREYSEL"], n_contracts
+            ),
+        }
+    )
+    contracts.loc[3, "Başlangıç T."] = pd.NaT
+    contracts.loc[3, "Üyelik Adı"] = "GOLD"
+    visits = pd.DataFrame(
+        {
+            "Kodu": rng.choice(["A", "B", "C", "D", "E"], n_visits),
+            "Giriş Tarihi": pd.Timestamp("2021-01-01")
+            + pd.to_timedelta(rng.integers(0, 330 * 24, n_visits), unit="h"),
+        }
+    )
+    return contracts, visits
+
+
+def _loop_features(contracts, visits):
+    # Vektörleştirilmeden önceki sözleşme başına döngü
+    results = []
+    for _, contract in contracts.iterrows():
+        start_date = contract["Başlangıç T."]
+        end_date = contract["Ek Süreli Bitiş T."]
+        contract_usage = visits[
+            (visits["Kodu"] == contract["Müşteri Kodu"])
+            & (visits["Giriş Tarihi"] >= start_date)
+            & (visits["Giriş Tarihi"] <= end_date)
+        ]
+        total_usage = contract_usage.shape[0]
+
+        last_30_days_start = end_date - timedelta(days=30)
+        last_30_days_count = contract_usage[
+            (contract_usage["Giriş Tarihi"] >= last_30_days_start)
+            & (contract_usage["Giriş Tarihi"] <= end_date)
+        ].shape[0]
+
+        if contract["Üyelik Adı"] in ["FIVE DAYS AİLE", "FIVE DAYS BİREYSEL"]:
+            days = pd.date_range(start=start_date, end=end_date, freq="D")
+            max_usage_days = sum(day.weekday() < 5 for day in days)
+        else:
+            max_usage_days = (end_date - start_date).days
+        results.append(
+            {
+                "Total Usage": total_usage,
+                "Last 30 Days Usage Count": last_30_days_count,
+                "Overall Usage Percentage (%)": (
+                    (total_usage / max_usage_days) * 100 if max_usage_days > 0 else 0
+                ),
+                "Last 30 Days Utilization (%)": (last_30_days_count / 30) * 100,
+            }
+        )
+    return pd.DataFrame(results, index=contracts.index)
+
+
+def test_usage_features_match_loop():
+    contracts, visits = _data()
+
+    features = compute_usage_features(contracts, visits)
+
+    pd.testing.assert_frame_equal(
+        features, _loop_features(contracts, visits), check_dtype=False
+    )
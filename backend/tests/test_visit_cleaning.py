@@ -0,0 +1,46 @@
+import pandas as pd
+
+from visit_cleaning import fix_placeholder_exits
+
+
+def _visits():
+    entry = pd.to_datetime(
+        [
+            "2024-01-02 10:00:00",
+            "2024-01-03 18:00:00",
+            "2024-01-02 09:00:00",
+            "2024-01-04 08:00:00",
+            "2024-01-05 07:30:00",
+        ]
+    )
+    exit = pd.to_datetime(
+        [
+            "2024-01-02 11:00:00",
+            "2024-01-03 23:59:59",
+            "2024-01-02 09:45:00",
+            "2024-01-04 23:59:59",
+            "2024-01-05 09:00:00",
+        ]
+    )
+    # Her kodun ortalaması var ve ortalamalar birbirinden farklı
+    return pd.DataFrame(
+        {
+            "Kodu": ["A", "A", "B", "B", "C"],
+            "Giriş Tarihi": entry,
+            "Çıkış Tarihi": exit,
+        }
+    )
+
+
+def test_category_kodu_matches_object_kodu():
+    visits = _visits()
+    categorical = visits.astype({"Kodu": "category"})
+
+    fixed = fix_placeholder_exits(categorical)
+
+    expected = fix_placeholder_exits(visits)
+    pd.testing.assert_frame_equal(
+        fixed.drop(columns="Kodu"), expected.drop(columns="Kodu")
+    )
+    assert fixed["Member Mean Duration (minutes)"].tolist() == [60, 60, 45, 45, 90]
+    assert fixed.loc[3, "Çıkış Tarihi"] == pd.Timestamp("2024-01-04 08:45:00")
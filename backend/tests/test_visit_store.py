@@ -0,0 +1,51 @@
+import os
+
+import pandas as pd
+
+import visit_store
+from visit_store import load_giris_cikis
+
+
+def _count_reads(monkeypatch):
+    reads = []
+    read_month = visit_store._read_month
+
+    def counting_read(file_path):
+        reads.append(file_path)
+        return read_month(file_path)
+
+    monkeypatch.setattr(visit_store, "_read_month", counting_read)
+    return reads
+
+
+def _parts(store_dir):
+    return sorted(name for name in os.listdir(store_dir) if name.endswith(".parquet"))
+
+
+def test_store_version_bump_rebuilds_months(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    giris_dir = tmp_path / "giris"
+    giris_dir.mkdir()
+    pd.DataFrame(
+        {
+            "Kodu": ["A", "B"],
+            "Giriş Tarihi": pd.to_datetime(["2024-01-02", "2024-01-03"]),
+            "Giriş Saati": ["10:00", "11:00"],
+            "Çıkış Saati": ["11:30", "12:15"],
+        }
+    ).to_excel(giris_dir / "ocak.xlsx", index=False)
+    store_dir = str(tmp_path / "store")
+    reads = _count_reads(monkeypatch)
+
+    first = load_giris_cikis(str(giris_dir), store_dir)
+    load_giris_cikis(str(giris_dir), store_dir)
+    assert len(reads) == 1
+    digest = visit_store.giris_cikis_digest(str(giris_dir), store_dir)
+
+    monkeypatch.setattr(visit_store, "STORE_VERSION", "test")
+    rebuilt = load_giris_cikis(str(giris_dir), store_dir)
+
+    assert len(reads) == 2
+    assert visit_store.giris_cikis_digest(str(giris_dir), store_dir) != digest
+    assert [name.split(".")[1] for name in _parts(store_dir)] == ["1", "test"]
+    pd.testing.assert_frame_equal(rebuilt, first)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from interval_join import count_in_intervals
+
+FIVE_DAY_MEMBERSHIPS = ["FIVE DAYS AİLE", "FIVE DAYS BİREYSEL"]
+
+
+def _weekdays_between(start: pd.Series, end: pd.Series) -> np.ndarray:
+    # pd.date_range(start, end, freq="D") içindeki hafta içi gün sayısı:
+    # start'tan günlük adımlarla end'e kadar giden son gün dahil
+    counts = np.zeros(len(start), dtype=np.int64)
+    valid = (start.notna() & end.notna() & (end >= start)).to_numpy()
+    if not valid.any():
+        return counts
+
+    start = start[valid]
+    steps = (end[valid] - start) // pd.Timedelta(days=1)
+    first_day = start.dt.normalize()
+    last_day = first_day + pd.to_timedelta(steps, unit="D")
+    counts[valid] = np.busday_count(
+        first_day.to_numpy(dtype="datetime64[D]"),
+        last_day.to_numpy(dtype="datetime64[D]") + np.timedelta64(1, "D"),
+    )
+    return counts
+
+
+def compute_usage_features(
+    contracts: pd.DataFrame,
+    visits: pd.DataFrame,
+    contract_key: str = "Müşteri Kodu",
+    visit_key: str = "Kodu",
+    visit_time: str = "Giriş Tarihi",
+) -> pd.DataFrame:
+    # Tüm sözleşmeler için kullanım feature'ları tek geçişte
+    start_date = pd.to_datetime(contracts["Başlangıç T."], errors="coerce")
+    end_date = pd.to_datetime(contracts["Ek Süreli Bitiş T."], errors="coerce")
+
+    # Total Usage Count
+    total_usage = count_in_intervals(
+        visits, contracts, visit_key, visit_time, contract_key, start_date, end_date
+    )
+
+    # Son 30 gün penceresi sözleşme aralığıyla kesiştirilir
+    last_30_days_start = end_date - pd.Timedelta(days=30)
+    last_30_days_count = count_in_intervals(
+        visits,
+        contracts,
+        visit_key,
+        visit_time,
+        contract_key,
+        last_30_days_start.where(last_30_days_start > start_date, start_date),
+        end_date,
+    )
+
+    # Five Days
+    five_days = contracts["Üyelik Adı"].isin(FIVE_DAY_MEMBERSHIPS).to_numpy()
+    max_usage_days = (end_date - start_date).dt.days.to_numpy(dtype=float)
+    max_usage_days[five_days] = _weekdays_between(
+        start_date[five_days], end_date[five_days]
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        overall_percentage = np.where(
+            max_usage_days > 0, (total_usage / max_usage_days) * 100, 0
+        )
+    last_30_days_percentage = (last_30_days_count / 30) * 100
+
+    return pd.DataFrame(
+        {
+            "Total Usage": total_usage,
+            "Last 30 Days Usage Count": last_30_days_count,
+            "Overall Usage Percentage (%)": overall_percentage,
+            "Last 30 Days Utilization (%)": last_30_days_percentage,
+        },
+        index=contracts.index,
+    )
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+GIRIS_CIKIS_DROP_COLUMNS = [
+    "Aktif",
+    "Üyelik Durumu",
+    "Söz. Durumu",
+    "Üyelik Sözleşmesi Detay Durumu",
+    "Mekan",
+    "Geç Çıkış Süresi(Dk.)",
+    "Giris Cihazı",
+    "Çıkış Cihazı",
+    "İptal Tarihi",
+]
+
+# Turnikeden çıkış okutmayanlara sistem 23:59:59 yazıyor
+PLACEHOLDER_EXIT = pd.Timedelta(hours=23, minutes=59, seconds=59)
+
+MIN_STAY_MINUTES = 15
+
+
+def _microseconds_of_day(times: pd.Series) -> np.ndarray:
+    # .dt.time gibi mikrosaniye hassasiyetinde; NaT -> -1
+    ns = (times - times.dt.normalize()).to_numpy(dtype="timedelta64[ns]")
+    microseconds = ns.astype(np.int64) // 1_000
+    return np.where(np.isnat(ns), -1, microseconds)
+
+
+def stay_minutes(entry_times: pd.Series, exit_times: pd.Series) -> pd.Series:
+    # Saat farkı, timedelta.seconds gibi: fark tam saniyeye aşağı yuvarlanır ve
+    # 86400'e göre mod alınır (çıkış girişten önceyse ertesi gün sayılır)
+    entry = _microseconds_of_day(entry_times)
+    exit = _microseconds_of_day(exit_times)
+    seconds = np.mod(np.floor_divide(exit - entry, 1_000_000), 86400)
+    return pd.Series(
+        np.where((entry < 0) | (exit < 0), np.nan, seconds / 60),
+        index=entry_times.index,
+    )
+
+
+def clean_giris_cikis(df: pd.DataFrame) -> pd.DataFrame:
+    # Tek bir aylık dosya ya da tüm geçmiş için aynı şekilde çalışır
+    df = df.drop(
+        columns=[col for col in GIRIS_CIKIS_DROP_COLUMNS if col in df.columns],
+        errors="ignore",
+    )
+    df["Kalış Süresi"] = stay_minutes(
+        pd.to_datetime(df["Giriş Saati"], format="%H:%M", errors="coerce"),
+        pd.to_datetime(df["Çıkış Saati"], format="%H:%M", errors="coerce"),
+    )
+
+    df = df[df["Kalış Süresi"] >= MIN_STAY_MINUTES]
+    df = df.drop(
+        columns=["Giriş Saati", "Çıkış Saati", "Giriş Zamanı", "Çıkış Zamanı"],
+        errors="ignore",
+    )
+    return df
+
+
+def fix_placeholder_exits(visits: pd.DataFrame) -> pd.DataFrame:
+    # 23:59:59 çıkışlarına üyenin (yoksa genel) ortalama kalış süresi eklenir
+    visits = visits.copy()
+    entry = visits["Giriş Tarihi"]
+    exit = visits["Çıkış Tarihi"]
+    placeholder = ((exit - exit.dt.normalize()) == PLACEHOLDER_EXIT).to_numpy()
+
+    duration = (exit - entry).dt.total_seconds() / 60
+    mean_durations = (
+        duration[~placeholder].groupby(visits["Kodu"], observed=True).mean()
+    )
+    # category Kodu'da map, ortalamalar tekil ve boşsuz olunca Categorical döner
+    member_mean = visits["Kodu"].map(mean_durations).astype(float)
+
+    visits["Duration (minutes)"] = duration.where(~placeholder, member_mean)
+    visits["Member Mean Duration (minutes)"] = member_mean
+
+    imputed = member_mean.fillna(member_mean.mean())[placeholder]
+    visits.loc[placeholder, "Çıkış Tarihi"] = entry[placeholder] + pd.to_timedelta(
+        imputed, unit="m"
+    )
+    return visits
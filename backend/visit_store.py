@@ -0,0 +1,140 @@
+import json
+import os
+
+import pandas as pd
+
+from excel_cache import (
+    find_frame,
+    manifest_digest,
+    prune_parts,
+    read_excel_cached,
+    read_part,
+    write_frame,
+)
+from dtypes import compact_frame
+from excel_reader import engine_name
+from pipeline import dir_digest
+from parallel_reader import read_excel_files
+from visit_cleaning import clean_giris_cikis
+
+STORE_DIR = "cache/giris_cikis"
+MANIFEST_FILE = "manifest.json"
+
+# Bump when clean_giris_cikis changes so stored months are rebuilt
+STORE_VERSION = "1"
+
+
+def _load_manifest(store_dir: str) -> dict:
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except Exception as e:
+        print(f"Manifest {manifest_path} could not be read, rebuilding: {e}")
+        return {}
+    # Parts parsed with another spreadsheet engine are rebuilt
+    if (
+        manifest.get("version") != STORE_VERSION
+        or manifest.get("engine", "default") != engine_name()
+    ):
+        return {}
+    return manifest.get("files", {})
+
+
+def _save_manifest(store_dir: str, files: dict) -> None:
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": STORE_VERSION, "engine": engine_name(), "files": files},
+            f,
+            indent=2,
+        )
+    os.replace(tmp_path, manifest_path)
+
+
+def _part_name(digest: str) -> str:
+    # Store sürümü ve motor parça adında: STORE_VERSION artınca ya da motor
+    # değişince eski parçalar bulunmaz, aylar yeniden parse edilir
+    return f"{digest}.{STORE_VERSION}.{engine_name()}"
+
+
+def _read_month(file_path: str) -> pd.DataFrame:
+    return clean_giris_cikis(read_excel_cached(file_path))
+
+
+def giris_cikis_digest(giriş_çıkış_dir: str, store_dir: str = STORE_DIR) -> str:
+    # Aşama anahtarı: manifest'teki aylar mtime / boyutla tanınır, yalnızca
+    # yeni ya da değişen dosyalar hash'lenir. Store sürümü de anahtarda:
+    # sürüm artınca aşama da yeniden çalışır
+    digest = dir_digest(giriş_çıkış_dir, _load_manifest(store_dir))
+    return f"{STORE_VERSION}.{digest}"
+
+
+def load_giris_cikis(giriş_çıkış_dir: str, store_dir: str = STORE_DIR):
+    # Her aylık dosya bir kez parse + temizlenir; değişmeyen aylar store'dan gelir
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = _load_manifest(store_dir)
+
+    # Önce hangi ayların yeniden parse edilmesi gerektiğine bakılır
+    months = []
+    for file in os.listdir(giriş_çıkış_dir):
+        if not file.endswith((".xls", ".xlsx")):
+            continue
+        file_path = os.path.join(giriş_çıkış_dir, file)
+        try:
+            stat = os.stat(file_path)
+            digest = manifest_digest(file_path, stat, manifest.get(file))
+            part_base = os.path.join(store_dir, _part_name(digest))
+            stored = find_frame(part_base) is not None
+            months.append((file, file_path, stat, digest, stored))
+        except Exception as e:
+            print(f"Error processing file {file_path}: {e}")
+
+    # Yeni / değişen aylar paralel parse edilir
+    parsed = read_excel_files(
+        [file_path for _, file_path, _, _, stored in months if not stored],
+        reader=_read_month,
+    )
+
+    files = {}
+    parts = []
+    for file, file_path, stat, digest, stored in months:
+        try:
+            part_base = os.path.join(store_dir, _part_name(digest))
+            if stored:
+                df = read_part(part_base)
+                if df is None:
+                    # Parça okunmadan önce silindi; ay yeniden parse edilir
+                    df = _read_month(file_path)
+                    write_frame(df, part_base)
+            elif file_path in parsed:
+                df = parsed[file_path]
+                write_frame(df, part_base)
+                print(f"Processed file: {file_path}")
+            else:
+                continue
+
+            files[file] = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "sha256": digest,
+            }
+            parts.append(df)
+
+        except Exception as e:
+            print(f"Error processing file {file_path}: {e}")
+
+    _save_manifest(store_dir, files)
+
+    # Months whose file was removed or replaced no longer need their part
+    live = {_part_name(entry["sha256"]) for entry in files.values()}
+    prune_parts(store_dir, live)
+
+    if not parts:
+        return pd.DataFrame()
+    # Kodu / Üyelik / Cinsiyet category olur; geçmiş büyüdükçe asıl bellek
+    # bu str kolonlarda
+    return compact_frame(pd.concat(parts, ignore_index=True))
@@ -0,0 +1,94 @@
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+from export import EXPORT_FORMATS
+
+# Her pipeline çalışması kendi klasörüne yazar: runs/<run_id>/
+RUNS_DIR = "runs"
+COMPLETE_MARKER = ".complete"
+
+# Yüklenen girdiler çalışmanın kendi klasöründe tutulur; sonraki bir yükleme
+# kuyruktaki ya da çalışan bir işin girdilerini ezemez. Gizli klasör, sonuç
+# zip'ine girmez
+INPUTS_DIR = ".inputs"
+
+# Saklama politikası: en yeni MAX_RUNS tamamlanmış çalışma tutulur,
+# MAX_RUN_AGE_DAYS'ten eski olanlar (bitmemiş olsa da) silinir
+MAX_RUNS = 10
+MAX_RUN_AGE_DAYS = 7
+
+
+def _run_dirs(runs_dir: str) -> list[str]:
+    # run_id zaman damgasıyla başladığı için isim sırası = oluşturulma sırası
+    if not os.path.isdir(runs_dir):
+        return []
+    return sorted(
+        os.path.join(runs_dir, name)
+        for name in os.listdir(runs_dir)
+        if os.path.isdir(os.path.join(runs_dir, name))
+    )
+
+
+def is_run_complete(run_dir: str) -> bool:
+    return os.path.exists(os.path.join(run_dir, COMPLETE_MARKER))
+
+
+def mark_run_complete(run_dir: str) -> None:
+    with open(os.path.join(run_dir, COMPLETE_MARKER), "w") as f:
+        f.write(datetime.now().isoformat(timespec="seconds"))
+
+
+def evict_runs(
+    runs_dir: str = RUNS_DIR,
+    max_runs: int = MAX_RUNS,
+    max_age_days: float = MAX_RUN_AGE_DAYS,
+) -> None:
+    run_dirs = _run_dirs(runs_dir)
+    complete = [d for d in run_dirs if is_run_complete(d)]
+    expired = time.time() - max_age_days * 86400
+
+    evicted = set(complete[: max(len(complete) - max_runs, 0)])
+    evicted.update(d for d in run_dirs if os.path.getmtime(d) < expired)
+
+    for run_dir in sorted(evicted):
+        print(f"Evicting run workspace: {run_dir}")
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def create_run_dir(runs_dir: str = RUNS_DIR) -> str:
+    evict_runs(runs_dir)
+
+    run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+    run_dir = os.path.join(runs_dir, run_id)
+    os.makedirs(run_dir)
+    return run_dir
+
+
+def run_inputs_dir(run_dir: str, *parts: str) -> str:
+    inputs_dir = os.path.join(run_dir, INPUTS_DIR, *parts)
+    os.makedirs(inputs_dir, exist_ok=True)
+    return inputs_dir
+
+
+def latest_run_file(file_name: str, runs_dir: str = RUNS_DIR):
+    # En son tamamlanmış ve dosyayı içeren çalışma; yoksa None
+    for run_dir in reversed(_run_dirs(runs_dir)):
+        file_path = os.path.join(run_dir, file_name)
+        if is_run_complete(run_dir) and os.path.exists(file_path):
+            return file_path
+    return None
+
+
+def latest_run_artifact(name: str, runs_dir: str = RUNS_DIR):
+    # Uzantısız çıktı adı; çalışma hangi formatta yazdıysa o dosya döner
+    for run_dir in reversed(_run_dirs(runs_dir)):
+        if not is_run_complete(run_dir):
+            continue
+        for extension in EXPORT_FORMATS.values():
+            file_path = os.path.join(run_dir, name + extension)
+            if os.path.exists(file_path):
+                return file_path
+    return None
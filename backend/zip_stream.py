@@ -0,0 +1,68 @@
+import io
+import os
+import zipfile
+
+CHUNK_SIZE = 1 << 20
+
+# Zaten sıkıştırılmış formatlar tekrar deflate edilmez
+STORED_EXTENSIONS = {".xlsx", ".zip", ".parquet", ".gz", ".png", ".jpg"}
+
+
+class _StreamBuffer(io.RawIOBase):
+    # Seek edilemeyen hedef: zipfile data descriptor yazar, biz de her
+    # yazılanı hemen istemciye aktarırız
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def list_artifacts(run_dir: str) -> list[tuple[str, str]]:
+    # (dosya yolu, zip içindeki isim); gizli marker dosyaları ve girdi
+    # klasörü hariç
+    artifacts = []
+    for root, dirs, files in os.walk(run_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for file in sorted(files):
+            if file.startswith("."):
+                continue
+            file_path = os.path.join(root, file)
+            artifacts.append((file_path, os.path.relpath(file_path, run_dir)))
+    return artifacts
+
+
+def stream_zip(artifacts: list[tuple[str, str]], chunk_size: int = CHUNK_SIZE):
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, "w") as zip_file:
+        for file_path, arcname in artifacts:
+            info = zipfile.ZipInfo.from_file(file_path, arcname)
+            extension = os.path.splitext(file_path)[1].lower()
+            if extension in STORED_EXTENSIONS:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+
+            print(f"Adding file: {file_path}")
+            with open(file_path, "rb") as src, zip_file.open(info, "w") as dst:
+                while chunk := src.read(chunk_size):
+                    dst.write(chunk)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+
+            data = buffer.drain()
+            if data:
+                yield data
+
+    # Central directory
+    yield buffer.drain()
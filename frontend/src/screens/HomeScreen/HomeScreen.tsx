@@ -13,6 +13,23 @@ import Sider from "../../components/Sider";
 import { LocalizationProvider, DatePicker } from "@mui/x-date-pickers";
 import { AdapterDateFns } from "@mui/x-date-pickers/AdapterDateFns";
 
+const JOB_POLL_INTERVAL_MS = 2000;
+
+// Uploads return a job id; poll until the run finishes, then fetch the zip
+const waitForJobResult = async (jobId: string) => {
+  while (true) {
+    const { data } = await axios.get(`http://localhost:8000/jobs/${jobId}`);
+    if (data.status === "finished") break;
+    if (data.status === "failed" || data.status === "cancelled") {
+      throw new Error(data.error || `Job ${jobId} ${data.status}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+  }
+  return axios.get(`http://localhost:8000/jobs/${jobId}/result`, {
+    responseType: "blob",
+  });
+};
+
 interface HomeScreenProps {
   results: { name: string }[];
   onProcessComplete: (resultName: string) => void;
@@ -105,15 +122,15 @@ const HomeScreen = ({ results, onProcessComplete }: HomeScreenProps) => {
 
     try {
       console.log("Uploading folder files...");
-      const response = await axios.post(
+      const job = await axios.post(
         "http://localhost:8000/upload",
         formData,
         {
           headers: { "Content-Type": "multipart/form-data" },
-          responseType: "blob",
         }
       );
-      console.log("Folder upload response:", response);
+      console.log("Folder upload job:", job.data);
+      const response = await waitForJobResult(job.data.job_id);
       const url = window.URL.createObjectURL(new Blob([response.data]));
       setDownloadLink(url);
       onProcessComplete("-- Detailed Customer Data");
@@ -140,15 +157,15 @@ const HomeScreen = ({ results, onProcessComplete }: HomeScreenProps) => {
 
     try {
       console.log("Uploading excel file...");
-      const response = await axios.post(
+      const job = await axios.post(
         "http://localhost:8000/upload_excel",
         formData,
         {
           headers: { "Content-Type": "multipart/form-data" },
-          responseType: "blob",
         }
       );
-      console.log("Excel upload response:", response);
+      console.log("Excel upload job:", job.data);
+      const response = await waitForJobResult(job.data.job_id);
       const url = window.URL.createObjectURL(new Blob([response.data]));
       setDownloadLink(url);
       onProcessComplete("Detailed Customer Data");